@@ -183,19 +183,32 @@
 #     app.run(debug=True, host="0.0.0.0", port=5000)
 
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
-from resume_analyzer import analyze_resume, export_analysis_to_pdf, export_analysis_to_excel
+from resume_analyzer import export_analysis_to_pdf, export_analysis_to_excel, write_analyses_xlsx, write_analyses_pdf, EXPORT_MAX_SHEETS, read_pdf_bytes, analysis_cache_key, RULES_VERSION
+from resume_rules import get_rules, available_packs
+from resume_bulk import iter_zip_pdfs, iter_uploaded_pdfs, analyze_many
+from result_cache import make_cache, DiskCache
+from resume_pool import ResumePool, PoolBusy, TaskFailed, TaskTimeout
 from io import BytesIO
-from opportunity_model import train_model, predict_opportunity, recommend_from_trends, load_dataset
+from opportunity_model import train_model, predict_opportunity, recommend_from_trends, load_model, predict_opportunity_batch, iter_students_csv, recommend_cache_stats, query_dataset, iter_dataset_records, EXPORT_COLUMNS, similar_students
 import os
+import csv
+import io
+import json
 from learning_path import generate_roadmap
 from skill_gap import skill_gap_bp
-from interview_analyzer import save_upload, analyze_file
+from interview_analyzer import save_upload, analyze_job, whisper_pool, WHISPER_CONCURRENCY
+from job_queue import JobQueue
+from job_index import JobIndex, normalize_skills
 from datetime import datetime
 from dotenv import load_dotenv
 from pymongo import MongoClient
 import uuid
+import time
+import shutil
+import tempfile
+import zipfile
 
 # ==== CONFIG ====
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -229,6 +242,33 @@ except Exception as e:
     print("Error connecting to MongoDB:", e)
     raise e
 
+# BM25 index of the job postings for resume matching; filled on first use, then kept current by
+# create_job and by a periodic catch-up on jobs other server processes inserted
+job_index = JobIndex()
+JOB_INDEX_SYNC_SEC = float(os.getenv("JOB_INDEX_SYNC_SEC", "60"))
+JOB_INDEX_FETCH_BATCH = 1000
+JOB_MATCH_MAX_K = 100
+_job_index_synced_at = None
+
+
+def _sync_job_index():
+    global _job_index_synced_at
+    now = time.monotonic()
+    if _job_index_synced_at is not None and now - _job_index_synced_at < JOB_INDEX_SYNC_SEC:
+        return
+    # jobs already added by create_job are skipped by id
+    query = {} if job_index.last_id is None else {"_id": {"$gt": job_index.last_id}}
+    for job in jobs_collection.find(query).sort("_id", 1):
+        job_index.add(job, advance=True)
+    # ObjectIds only roughly follow insertion order (per-process counters, client-generated ids),
+    # so a job can land below last_id after the catch-up passed it; a count mismatch finds those
+    if jobs_collection.count_documents({}) != len(job_index):
+        missing = job_index.missing(doc["_id"] for doc in jobs_collection.find({}, {"_id": 1}))
+        for start in range(0, len(missing), JOB_INDEX_FETCH_BATCH):
+            for job in jobs_collection.find({"_id": {"$in": missing[start:start + JOB_INDEX_FETCH_BATCH]}}):
+                job_index.add(job)
+    _job_index_synced_at = now
+
 @app.route("/api/jobs", methods=["POST"])
 def create_job():
     try:
@@ -236,11 +276,18 @@ def create_job():
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        jobs_collection.insert_one({
+        job = {
             "companyName": data.get("companyName"),
             "jobRole": data.get("jobRole"),
             "location": data.get("location")
-        })
+        }
+        skills = normalize_skills(data.get("skills"))
+        if skills:
+            job["skills"] = skills
+        if data.get("description"):
+            job["description"] = data.get("description")
+        jobs_collection.insert_one(job)  # sets job["_id"]
+        job_index.add(job)
 
         return jsonify({"message": "Job posted successfully"}), 201
     except Exception as e:
@@ -255,6 +302,49 @@ def get_jobs():
     except Exception as e:
         print("Error fetching jobs:", e)
         return jsonify({"error": "Server error"}), 500
+
+
+@app.route("/api/jobs/match", methods=["POST"])
+def match_jobs():
+    """
+    Ranks job postings against a resume: a PDF in field 'file', or JSON {"text": "..."}.
+    Optional top_k (default 10, at most JOB_MATCH_MAX_K) as a form field, JSON key or query arg.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        top_k = int(request.form.get("top_k") or body.get("top_k") or request.args.get("top_k") or 10)
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k must be an integer"}), 400
+    top_k = max(1, min(top_k, JOB_MATCH_MAX_K))
+    try:
+        if 'file' in request.files:
+            text = resume_pool.extract_text(read_pdf_bytes(request.files['file']))
+        elif body.get("text"):
+            text = str(body["text"])
+        else:
+            return jsonify({"error": "Provide a resume PDF in 'file' or JSON with 'text'"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 413
+    except PoolBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except TaskTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except TaskFailed as e:
+        return jsonify({"error": f"Could not read this PDF: {e}"}), 422
+    try:
+        _sync_job_index()
+    except Exception as e:
+        # serve from what is already indexed; the next request retries the catch-up
+        print("Error syncing job index:", e)
+    t0 = time.perf_counter()
+    matches = job_index.search(text, top_k)
+    return jsonify({"status": "ok", "matches": matches, "indexed_jobs": len(job_index),
+                    "took_ms": round((time.perf_counter() - t0) * 1000, 2)}), 200
+
+
+@app.route("/api/jobs/index", methods=["GET"])
+def job_index_stats():
+    return jsonify({"status": "ok", "index": job_index.stats()}), 200
     
 # ==== APPLICATION ROUTE ====
 @app.route("/apply/<job_id>", methods=["POST"])
@@ -291,29 +381,173 @@ app.register_blueprint(skill_gap_bp, url_prefix="/api/skill-gap")
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# one training job at a time; each job already spreads its three forests over every core
+train_jobs = JobQueue("train-opportunity", max_workers=1, retention_sec=float(os.getenv("TRAIN_JOB_RETENTION_SEC", "86400")))
+# interview analyses (ffmpeg + Whisper + LanguageTool); Whisper itself is bounded by WHISPER_CONCURRENCY
+interview_jobs = JobQueue("interview-analyze", max_workers=int(os.getenv("INTERVIEW_WORKERS", str(WHISPER_CONCURRENCY))),
+                          retention_sec=float(os.getenv("INTERVIEW_JOB_RETENTION_SEC", "3600")))
+INTERVIEW_MAX_QUEUE = int(os.getenv("INTERVIEW_MAX_QUEUE", "32"))
+# a streamed analysis sends a status line at least this often, so a dropped client is noticed
+INTERVIEW_STREAM_KEEPALIVE_SEC = float(os.getenv("INTERVIEW_STREAM_KEEPALIVE_SEC", "15"))
+
+# resume parsing runs in separate processes so a heavy or malformed PDF cannot stall or crash this worker
+resume_pool = ResumePool(
+    workers=int(os.getenv("RESUME_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    timeout_sec=float(os.getenv("RESUME_TASK_TIMEOUT_SEC", "30")),
+    memory_mb=int(os.getenv("RESUME_WORKER_MEMORY_MB", "1024")),
+    max_queue=int(os.getenv("RESUME_POOL_MAX_QUEUE", "64")),
+)
+# analyses keyed by the SHA-256 of the PDF bytes; a change to the analyzer's rules starts a fresh namespace
+resume_cache = DiskCache(
+    os.getenv("RESUME_CACHE_DIR", os.path.join(BASE_DIR, "data", ".cache", "resume_analyses")), RULES_VERSION,
+    max_entries=int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("RESUME_CACHE_MAX_MB", "256")) * 1024 * 1024,
+)
+# finished bulk analyses, kept so the combined workbook can be downloaded afterwards
+bulk_results = make_cache("resume-bulk", int(os.getenv("RESUME_BULK_KEEP", "32")),
+                          float(os.getenv("RESUME_BULK_RETENTION_SEC", "3600")))
+
+def _remove_upload(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _submit_interview(f):
+    """Saves the upload and queues its analysis; returns (job_id, None) or (None, error response)."""
+    if f.filename == "":
+        return None, (jsonify({"status": "error", "message": "Empty filename"}), 400)
+    if interview_jobs.stats()["queue_depth"] >= INTERVIEW_MAX_QUEUE:
+        return None, (jsonify({"status": "error", "message": "Interview analysis queue is full, try again shortly"}),
+                      503)
+    path = save_upload(f)
+    return interview_jobs.submit(analyze_job, path, cleanup=lambda: _remove_upload(path)), None
+
+
 @app.route("/api/interview/analyze", methods=["POST"])
 def api_interview_analyze():
+    """Synchronous analysis; runs through the interview job queue and waits for the result."""
     try:
         if "file" not in request.files:
             return jsonify({"status": "error", "message": "No file provided"}), 400
 
-        f = request.files["file"]
-        if f.filename == "":
-            return jsonify({"status": "error", "message": "Empty filename"}), 400
+        job_id, error = _submit_interview(request.files["file"])
+        if error:
+            return error
+        job = interview_jobs.wait(job_id)
+        if job["status"] != "succeeded":
+            return jsonify({"status": "error", "message": job["error"] or job["status"]}), 500
 
-        path = save_upload(f)
-        analysis = analyze_file(path)
+        return jsonify({"status": "ok", "analysis": job["result"]}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-        try:
-            os.remove(path)
-        except Exception:
-            pass
 
-        return jsonify({"status": "ok", "analysis": analysis}), 200
+@app.route("/api/interview/jobs", methods=["POST"])
+def api_interview_submit():
+    """Queues an analysis; poll /api/interview/jobs/<job_id> and fetch /api/interview/jobs/<job_id>/result."""
+    try:
+        if "file" not in request.files:
+            return jsonify({"status": "error", "message": "No file provided"}), 400
+        job_id, error = _submit_interview(request.files["file"])
+        if error:
+            return error
+        return jsonify({"status": "ok", "job_id": job_id,
+                        "status_url": f"/api/interview/jobs/{job_id}",
+                        "result_url": f"/api/interview/jobs/{job_id}/result"}), 202
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/api/interview/jobs", methods=["GET"])
+def api_interview_queue():
+    return jsonify({"status": "ok", "queue": interview_jobs.stats(), "max_queue": INTERVIEW_MAX_QUEUE,
+                    "whisper_concurrency": WHISPER_CONCURRENCY}), 200
+
+
+@app.route("/api/interview/whisper", methods=["GET"])
+def api_interview_whisper():
+    """Whisper pool sizing and per-instance utilization."""
+    return jsonify({"status": "ok", "whisper": whisper_pool.stats()}), 200
+
+
+@app.route("/api/interview/jobs/<job_id>", methods=["GET"])
+def api_interview_status(job_id):
+    job = interview_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    job.pop("result")  # served by /result
+    return jsonify({"status": "ok", "job": job}), 200
+
+
+@app.route("/api/interview/jobs/<job_id>/result", methods=["GET"])
+def api_interview_result(job_id):
+    job = interview_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown or expired job id"}), 404
+    if job["status"] == "succeeded":
+        return jsonify({"status": "ok", "analysis": job["result"]}), 200
+    job.pop("result")
+    if job["status"] in ("queued", "running"):
+        return jsonify({"status": "pending", "job": job}), 202
+    return jsonify({"status": "error", "message": job["error"] or job["status"], "job": job}), 409
+
+
+@app.route("/api/interview/jobs/<job_id>/cancel", methods=["POST"])
+def api_interview_cancel(job_id):
+    job = interview_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    job.pop("result")
+    return jsonify({"status": "ok", "job": job}), 200
+
+
+@app.route("/api/interview/analyze/stream", methods=["POST"])
+def api_interview_analyze_stream():
+    """
+    Same input as /api/interview/analyze; the analysis runs through the interview job queue.
+    Streams NDJSON: {"status": "queued" | "running", "job_id"} whenever the job changes state
+    (and as a keepalive), {"status": "progress", "partial": {...}} after every transcribed
+    segment, then {"status": "ok", "analysis": {...}} or {"status": "error", "message"}.
+    The job is cancelled if the client goes away before it ends.
+    """
+    if "file" not in request.files:
+        return jsonify({"status": "error", "message": "No file provided"}), 400
+    job_id, error = _submit_interview(request.files["file"])
+    if error:
+        return error
+
+    def generate():
+        seen = 0
+        status = None
+        try:
+            while True:
+                job, events = interview_jobs.events(job_id, seen, timeout=INTERVIEW_STREAM_KEEPALIVE_SEC)
+                if job is None:
+                    yield json.dumps({"status": "error", "message": "Job expired"}) + "\n"
+                    return
+                if job["status"] in ("queued", "running") and (job["status"] != status or not events):
+                    status = job["status"]
+                    yield json.dumps({"status": status, "job_id": job_id}) + "\n"
+                for partial in events:
+                    yield json.dumps({"status": "progress", "partial": partial}) + "\n"
+                seen += len(events)
+                if job["status"] == "succeeded":
+                    yield json.dumps({"status": "ok", "analysis": job["result"]}) + "\n"
+                    return
+                if job["status"] in ("failed", "cancelled"):
+                    yield json.dumps({"status": "error", "message": job["error"] or job["status"]}) + "\n"
+                    return
+        finally:
+            # no-op once the job is over; stops it (and frees its Whisper slot) if the client left
+            interview_jobs.cancel(job_id)
+
+    # no-buffering hint so reverse proxies pass each line through as it is produced
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
+
+
 @app.route("/api/learning-path", methods=["POST"])
 def api_learning_path():
     try:
@@ -333,10 +567,130 @@ def analyze():
     if 'file' not in request.files:
         return jsonify({"error": "No file provided"}), 400
     file = request.files['file']
-    result = analyze_resume(file)
+    rule_pack = request.form.get('rule_pack') or None
+    try:
+        get_rules(rule_pack)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        data = read_pdf_bytes(file)
+        key = analysis_cache_key(data, rule_pack)
+        result = resume_cache.get(key)
+        if result is None:
+            result = resume_pool.analyze(data, rule_pack)
+            resume_cache.set(key, result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 413
+    except PoolBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except TaskTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except TaskFailed as e:
+        return jsonify({"error": f"Could not analyze this PDF: {e}"}), 422
     return jsonify(result)
 
 
+@app.route('/api/analyze-resume/pool', methods=['GET'])
+def analyze_pool_stats():
+    return jsonify({"status": "ok", "pool": resume_pool.stats()}), 200
+
+
+@app.route('/api/analyze-resume/rule-packs', methods=['GET'])
+def analyze_rule_packs():
+    return jsonify({"status": "ok", "rule_packs": available_packs()}), 200
+
+
+@app.route('/api/analyze-resume/cache', methods=['GET'])
+def analyze_cache_stats():
+    return jsonify({"status": "ok", "cache": resume_cache.stats()}), 200
+
+
+@app.route('/api/analyze-resume/bulk', methods=['POST'])
+def analyze_bulk():
+    """
+    Accepts a zip of PDFs in field 'file', or several PDFs in field 'files', and an optional
+    'rule_pack'. Streams one NDJSON line per file as it finishes, then a final
+    {"status": "done", "batch_id", "excel_url", "pdf_url"} line.
+    """
+    rule_pack = request.form.get('rule_pack') or None
+    try:
+        get_rules(rule_pack)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if 'file' in request.files:
+        if not zipfile.is_zipfile(request.files['file'].stream):
+            return jsonify({"error": "Field 'file' must be a zip archive"}), 400
+        request.files['file'].stream.seek(0)
+        spooled = [_spool_upload(request.files['file'])]
+        items = iter_zip_pdfs(spooled[0])
+    elif request.files.getlist('files'):
+        uploads = request.files.getlist('files')
+        spooled = [_spool_upload(f) for f in uploads]
+        items = iter_uploaded_pdfs([(f.filename, tmp) for f, tmp in zip(uploads, spooled)])
+    else:
+        return jsonify({"error": "No file provided"}), 400
+    batch_id = uuid.uuid4().hex
+
+    def generate():
+        results = []
+        try:
+            for res in analyze_many(resume_pool, items, cache=resume_cache, rule_pack=rule_pack):
+                results.append((res["file"], res.get("analysis")))
+                yield json.dumps(res) + "\n"
+        except Exception as e:
+            yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+        finally:
+            for tmp in spooled:
+                tmp.close()
+        bulk_results.set(batch_id, results)
+        ok = sum(1 for _, a in results if a)
+        yield json.dumps({"status": "done", "batch_id": batch_id, "total": len(results), "succeeded": ok,
+                          "failed": len(results) - ok,
+                          "excel_url": f"/api/analyze-resume/bulk/{batch_id}/excel",
+                          "pdf_url": f"/api/analyze-resume/bulk/{batch_id}/pdf"}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _send_report(results, fmt, download_name, layout=None):
+    """Writes a cohort report to a temp file and streams it back; memory does not grow with the cohort."""
+    tmp = tempfile.TemporaryFile()
+    try:
+        if fmt == "pdf":
+            write_analyses_pdf(results, tmp)
+            mimetype = "application/pdf"
+        else:
+            write_analyses_xlsx(results, tmp, layout or "rows")
+            mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        tmp.seek(0)
+    except Exception:
+        tmp.close()
+        raise
+    return send_file(tmp, mimetype=mimetype, download_name=f"{download_name}.{fmt}", as_attachment=True)
+
+
+@app.route('/api/analyze-resume/bulk/<batch_id>/excel', methods=['GET'])
+def analyze_bulk_excel(batch_id):
+    """One sheet per file for small batches, otherwise one block of rows per file (?layout= overrides)."""
+    results = bulk_results.get(batch_id)
+    if results is None:
+        return jsonify({"error": "Unknown or expired batch id"}), 404
+    layout = request.args.get('layout') or ("sheets" if len(results) <= EXPORT_MAX_SHEETS else "rows")
+    if layout not in ("rows", "sheets"):
+        return jsonify({"error": "layout must be 'rows' or 'sheets'"}), 400
+    if layout == "sheets" and len(results) > EXPORT_MAX_SHEETS:
+        return jsonify({"error": f"layout 'sheets' supports at most {EXPORT_MAX_SHEETS} files"}), 400
+    return _send_report(results, "xlsx", f"resume_analysis_{batch_id[:8]}", layout)
+
+
+@app.route('/api/analyze-resume/bulk/<batch_id>/pdf', methods=['GET'])
+def analyze_bulk_pdf(batch_id):
+    results = bulk_results.get(batch_id)
+    if results is None:
+        return jsonify({"error": "Unknown or expired batch id"}), 404
+    return _send_report(results, "pdf", f"resume_analysis_{batch_id[:8]}")
+
+
 @app.route('/api/export-pdf', methods=['POST'])
 def export_pdf():
     data = request.json
@@ -351,15 +705,67 @@ def export_excel():
     return send_file(BytesIO(excel_bytes), download_name='analysis_report.xlsx', as_attachment=True)
 
 
+@app.route('/api/export-batch', methods=['POST'])
+def export_batch():
+    """
+    Cohort report from analyses the client already has. JSON body:
+        {"format": "pdf" | "xlsx", "layout": "rows" | "sheets",
+         "analyses": [{"file": "name.pdf", "analysis": {...}}, ...]}
+    Items may be the NDJSON lines of /api/analyze-resume/bulk; failed items go to the overview only.
+    """
+    data = request.get_json(silent=True) or {}
+    fmt = (data.get("format") or "xlsx").lower()
+    layout = data.get("layout") or "rows"
+    items = data.get("analyses")
+    if fmt not in ("pdf", "xlsx"):
+        return jsonify({"error": "format must be 'pdf' or 'xlsx'"}), 400
+    if layout not in ("rows", "sheets"):
+        return jsonify({"error": "layout must be 'rows' or 'sheets'"}), 400
+    if not isinstance(items, list):
+        return jsonify({"error": "analyses must be a list"}), 400
+    if layout == "sheets" and len(items) > EXPORT_MAX_SHEETS:
+        return jsonify({"error": f"layout 'sheets' supports at most {EXPORT_MAX_SHEETS} analyses"}), 400
+    try:
+        results = [(str(item.get("file") or f"resume_{i + 1}"), item.get("analysis"))
+                   for i, item in enumerate(items)]
+        for name, analysis in results:
+            if analysis is not None and not all(k in analysis for k in ("score", "summary", "good_points",
+                                                                         "suggestions")):
+                return jsonify({"error": f"Incomplete analysis for {name}"}), 400
+        return _send_report(results, fmt, "cohort_report", layout)
+    except (AttributeError, TypeError) as e:
+        return jsonify({"error": f"Malformed analyses: {e}"}), 400
+
+
 @app.route("/api/train-opportunity", methods=["POST"])
 def api_train():
+    """Queues a background training job; poll /api/train-opportunity/<job_id> for progress."""
     try:
-        path = train_model()
-        return jsonify({"status": "ok", "message": f"Model trained: {path}"}), 200
+        data = request.get_json(silent=True) or {}
+        random_state = int(data.get("random_state", 42))
+        job_id = train_jobs.submit(train_model, random_state=random_state)
+        return jsonify({"status": "ok", "job_id": job_id, "message": "Training started"}), 202
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/api/train-opportunity/<job_id>", methods=["GET"])
+def api_train_status(job_id):
+    job = train_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    # result is the artifact path once the job has succeeded
+    return jsonify({"status": "ok", "job": job}), 200
+
+
+@app.route("/api/train-opportunity/<job_id>/cancel", methods=["POST"])
+def api_train_cancel(job_id):
+    job = train_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    return jsonify({"status": "ok", "job": job}), 200
+
+
 @app.route("/api/predict-opportunity", methods=["POST"])
 def api_predict():
     try:
@@ -375,6 +781,49 @@ def api_predict():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _spool_upload(file_storage):
+    """
+    Copies an upload into a temporary file owned by the caller. Flask closes request.files when
+    the view returns, before a streamed response body runs.
+    """
+    tmp = tempfile.TemporaryFile()
+    shutil.copyfileobj(file_storage.stream, tmp)
+    tmp.seek(0)
+    return tmp
+
+
+@app.route("/api/predict-opportunity/batch", methods=["POST"])
+def api_predict_batch():
+    """
+    Accepts either a CSV upload in field 'file' (Branch, CGPA, Skills, Year columns)
+    or JSON {"students": [{"branch": ..., "cgpa": ..., "skills": ..., "year": ...}, ...]}.
+    Streams one NDJSON line per student.
+    """
+    try:
+        spooled = None
+        if "file" in request.files:
+            spooled = _spool_upload(request.files["file"])
+            students = iter_students_csv(spooled)
+        else:
+            data = request.get_json() or {}
+            students = data.get("students", []) if isinstance(data, dict) else data
+        load_model()
+
+        def generate():
+            try:
+                for res in predict_opportunity_batch(students):
+                    yield json.dumps(res) + "\n"
+            except Exception as e:
+                yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+            finally:
+                if spooled is not None:
+                    spooled.close()
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @app.route("/api/recommend-from-trends", methods=["POST"])
 def api_recommend_trends():
     try:
@@ -385,17 +834,101 @@ def api_recommend_trends():
         skills = [s.strip() for s in skills_raw.split(",")] if isinstance(skills_raw, str) else skills_raw
         year = data.get("year", None)
         top_k = int(data.get("top_k", 10))
-        res = recommend_from_trends(skills_input=skills, branch=branch, cgpa=cgpa, year=year, top_k=top_k)
+        cursor = data.get("cursor") or None
+        res = recommend_from_trends(skills_input=skills, branch=branch, cgpa=cgpa, year=year, top_k=top_k, cursor=cursor)
+        return jsonify({"status": "ok", "result": res}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route("/api/similar-students", methods=["POST"])
+def api_similar_students():
+    """{"skills": ..., "top_k": 10, "mode": "approximate" (MinHash/LSH, default) or "exact"}"""
+    try:
+        data = request.get_json() or {}
+        skills_raw = data.get("skills", "")
+        skills = [s.strip() for s in skills_raw.split(",")] if isinstance(skills_raw, str) else skills_raw
+        top_k = int(data.get("top_k", 10))
+        mode = str(data.get("mode", "approximate")).lower()
+        if mode not in ("approximate", "exact"):
+            return jsonify({"status": "error", "message": "mode must be 'approximate' or 'exact'"}), 400
+        res = similar_students(skills, top_k=top_k, exact=mode == "exact")
         return jsonify({"status": "ok", "result": res}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/api/recommend-from-trends/cache", methods=["GET"])
+def api_recommend_cache_stats():
+    return jsonify({"status": "ok", "cache": recommend_cache_stats()}), 200
+
+
+# query parameter -> dataset column for /api/dataset filters
+DATASET_FILTER_PARAMS = {"branch": "Branch", "year": "Year", "company": "Company", "job_role": "JobRole",
+                         "opportunity_type": "OpportunityType"}
+
+
+def _dataset_rows_from_args(args):
+    """Filters from query parameters; repeated or comma-separated values match any of them."""
+    filters = {}
+    for param, column in DATASET_FILTER_PARAMS.items():
+        values = [v.strip() for raw in args.getlist(param) for v in raw.split(",") if v.strip()]
+        if values:
+            filters[column] = values
+    cgpa_min = float(args["cgpa_min"]) if args.get("cgpa_min") else None
+    cgpa_max = float(args["cgpa_max"]) if args.get("cgpa_max") else None
+    rows = query_dataset(filters, cgpa_min, cgpa_max)
+    if args.get("limit"):
+        rows = rows[:max(0, int(args["limit"]))]
+    return rows
+
+
+@app.route("/api/dataset", methods=["GET"])
+def api_dataset():
+    """
+    Streams the filtered placement history. Filters: branch, year, company, job_role,
+    opportunity_type, cgpa_min, cgpa_max; optional limit; format=ndjson (default) or csv.
+    """
+    try:
+        fmt = (request.args.get("format") or "ndjson").lower()
+        if fmt not in ("ndjson", "csv"):
+            return jsonify({"status": "error", "message": "format must be 'ndjson' or 'csv'"}), 400
+        rows = _dataset_rows_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    def generate_ndjson():
+        for chunk in iter_dataset_records(rows):
+            yield "".join(json.dumps(rec) + "\n" for rec in chunk)
+
+    def generate_csv():
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for chunk in iter_dataset_records(rows):
+            writer.writerows(chunk)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    headers = {"X-Total-Count": str(len(rows))}
+    if fmt == "csv":
+        headers["Content-Disposition"] = "attachment; filename=placement_history.csv"
+        return Response(stream_with_context(generate_csv()), mimetype="text/csv", headers=headers)
+    return Response(stream_with_context(generate_ndjson()), mimetype="application/x-ndjson", headers=headers)
+
+
 @app.route("/api/sample-data", methods=["GET"])
 def api_sample():
+    """First 20 rows; kept for existing clients, /api/dataset supports filters and full exports."""
     try:
-        df = load_dataset()
-        sample = df.head(20).to_dict(orient="records")
+        sample = next(iter_dataset_records(query_dataset()[:20]), [])
         return jsonify({"status": "ok", "sample": sample}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -0,0 +1,98 @@
+# backend/benchmarks/predict_latency.py
+"""
+Latency benchmark for the /api/predict-opportunity code path.
+
+Compares the old single-row path (dict over every feature -> one-row DataFrame ->
+sklearn .predict on each forest) with the current one (preallocated NumPy row filled
+via the artifact's feature index -> forest evaluation without per-call validation),
+and prints p50/p99 latency for both.
+
+Usage (from backend/, after training a model):
+    python -m benchmarks.predict_latency --requests 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_registry  # noqa: E402
+import opportunity_model as om  # noqa: E402
+
+
+def _legacy_predict(branch, cgpa, skills, year):
+    bundle = om.load_model()
+    models = model_registry.bundle_models(bundle)
+    base = {c: 0 for c in bundle["feature_columns"]}
+    branch_col = f"branch_{branch.strip().upper()}" if branch else None
+    if branch_col and branch_col in base:
+        base[branch_col] = 1
+    base["CGPA"] = float(cgpa)
+    base["Year"] = int(year) if year is not None else 0
+    skills_norm = [s.strip().lower() for s in skills if s and isinstance(s, str)]
+    for sname in bundle["mlb"].classes_:
+        col = f"skill__{sname}"
+        if col in base:
+            base[col] = int(sname in skills_norm)
+    X = pd.DataFrame([base], columns=bundle["feature_columns"])
+    return {
+        "company": models["company"].predict(X)[0],
+        "role": models["role"].predict(X)[0],
+        "package": round(float(models["package"].predict(X)[0]), 2),
+    }
+
+
+def _sample_requests(n, seed=0):
+    df = om.load_dataset()
+    rng = random.Random(seed)
+    skills = sorted(om._skill_vocab)
+    branches = sorted(df["Branch"].unique())
+    return [
+        (rng.choice(branches), round(rng.uniform(6.0, 10.0), 1), rng.sample(skills, rng.randint(1, 4)), rng.choice([2023, 2024, 2025]))
+        for _ in range(n)
+    ]
+
+
+def _time_path(fn, reqs):
+    lat = np.empty(len(reqs))
+    for i, r in enumerate(reqs):
+        t0 = time.perf_counter()
+        fn(*r)
+        lat[i] = time.perf_counter() - t0
+    return {"p50_ms": round(float(np.percentile(lat, 50)) * 1000, 3), "p99_ms": round(float(np.percentile(lat, 99)) * 1000, 3)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--warmup", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    om.load_model()
+    reqs = _sample_requests(args.requests + args.warmup)
+    warm, reqs = reqs[:args.warmup], reqs[args.warmup:]
+    for r in warm:
+        _legacy_predict(*r)
+        om.predict_opportunity(*r)
+
+    mismatches = sum(_legacy_predict(*r) != om.predict_opportunity(*r) for r in reqs[:200])
+    legacy = _time_path(_legacy_predict, reqs)
+    current = _time_path(om.predict_opportunity, reqs)
+    report = {
+        "requests": len(reqs),
+        "legacy": legacy,
+        "current": current,
+        "p50_speedup": round(legacy["p50_ms"] / max(current["p50_ms"], 1e-9), 2),
+        "p99_speedup": round(legacy["p99_ms"] / max(current["p99_ms"], 1e-9), 2),
+        "mismatches_in_first_200": int(mismatches),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
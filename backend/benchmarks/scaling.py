@@ -0,0 +1,213 @@
+# backend/benchmarks/scaling.py
+"""
+Scaling benchmark for opportunity_model on synthetic datasets.
+
+For each size, a synthetic CSV is generated (benchmarks.synthetic_data, reused from --workdir
+if present) and a fresh child process measures, in order:
+  load_dataset_cold   parse the CSV and build the columnar cache plus every in-memory index
+  load_dataset_warm   reload from the columnar cache
+  train_model         skipped above --train-max-rows; later steps then use the last model trained
+  predict_opportunity --requests single predictions
+  recommend_from_trends --requests queries, with the result cache disabled
+
+A child that crashes, is killed (e.g. by the OOM killer) or runs past --timeout-sec is
+reported as failed for that size, with the steps it finished, and the run moves on.
+
+Every step records wall time, peak RSS (sampled from /proc/self/statm, or ru_maxrss where
+that is unavailable) and throughput (rows/s for load and train, requests/s otherwise). The
+JSON report carries the git commit so runs can be compared across commits.
+
+Usage (from backend/):
+    python -m benchmarks.scaling --sizes 1e4,1e5,1e6 --out scaling_report.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from queue import Empty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_SEC = 0.01
+POLL_SEC = 1.0
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm", "r") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PeakRss:
+    """Samples RSS on a background thread while the block runs."""
+
+    def __enter__(self):
+        self.start = self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_SEC):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def _measure(fn, units):
+    with _PeakRss() as rss:
+        t0 = time.perf_counter()
+        fn()
+        wall = time.perf_counter() - t0
+    return {
+        "wall_sec": round(wall, 4),
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "rss_delta_mb": round((rss.peak - rss.start) / 2 ** 20, 1),
+        "throughput_per_sec": round(units / wall, 2) if wall > 0 else None,
+    }
+
+
+def _run_size(csv_path, workdir, n_rows, n_requests, train, queue):
+    # runs in a spawned child so peak RSS and module state start fresh for every size; each
+    # finished step is sent as (name, result) so a crash later on keeps the earlier ones, and
+    # None marks the end
+    os.environ["RECOMMEND_CACHE_SIZE"] = "0"
+    import opportunity_model as om
+    om.DATA_PATH = csv_path
+    om.DATA_CACHE_DIR = os.path.join(workdir, "cache")
+    om.MODEL_DIR = os.path.join(workdir, "models")
+    om.MODEL_PATH = os.path.join(om.MODEL_DIR, "opportunity_model.joblib")
+
+    def step(name, result):
+        queue.put((name, result))
+
+    step("load_dataset_cold", _measure(om.reload_dataset, n_rows))
+    step("load_dataset_warm", _measure(om.reload_dataset, n_rows))
+    if train:
+        step("train_model", _measure(om.train_model, n_rows))
+    else:
+        step("train_model", {"skipped": "rows above --train-max-rows"})
+
+    rng = random.Random(0)
+    df = om.load_dataset()
+    rows = [rng.randrange(n_rows) for _ in range(n_requests)]
+    reqs = [(str(df["Branch"].iat[r]), float(df["CGPA"].iat[r]), om.skills_for_row(r), int(df["Year"].iat[r]))
+            for r in rows]
+    try:
+        om.load_model()
+    except FileNotFoundError:
+        step("predict_opportunity", {"skipped": "no trained model"})
+        step("recommend_from_trends", {"skipped": "no trained model"})
+    else:
+        step("predict_opportunity", _measure(lambda: [om.predict_opportunity(*q) for q in reqs], n_requests))
+        step("recommend_from_trends", _measure(
+            lambda: [om.recommend_from_trends(q[2], branch=q[0], cgpa=q[1], year=q[3]) for q in reqs], n_requests))
+    queue.put(None)
+
+
+def _collect(proc, queue, timeout_sec):
+    """Steps sent by a size's child until it finishes, dies or times out; returns (steps, failure or None)."""
+    steps = {}
+    deadline = time.monotonic() + timeout_sec if timeout_sec else None
+    while True:
+        try:
+            item = queue.get(timeout=POLL_SEC)
+        except Empty:
+            if not proc.is_alive():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                proc.kill()
+                proc.join()
+                return steps, f"timed out after {timeout_sec:g}s"
+            continue
+        if item is None:
+            proc.join()
+            return steps, None if proc.exitcode == 0 else f"exited with code {proc.exitcode}"
+        steps[item[0]] = item[1]
+    # the child is gone without its end marker; pick up steps still buffered in the pipe
+    while True:
+        try:
+            item = queue.get(timeout=0.1)
+        except Empty:
+            break
+        if item is not None:
+            steps[item[0]] = item[1]
+    proc.join()
+    code = proc.exitcode
+    if code is not None and code < 0:
+        sig = signal.Signals(-code).name
+        return steps, f"killed by {sig}" + (" (likely out of memory)" if -code == signal.SIGKILL else "")
+    return steps, f"crashed with exit code {code}"
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1e4,1e5,1e6", help="comma-separated row counts")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--train-max-rows", type=float, default=1e5)
+    ap.add_argument("--workdir", default=os.path.join("benchmarks", ".scaling"))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout-sec", type=float, default=0, help="per-size limit, 0 for none")
+    ap.add_argument("--out", default="scaling_report.json")
+    args = ap.parse_args(argv)
+
+    from benchmarks import synthetic_data
+
+    os.makedirs(args.workdir, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for n_rows in sorted(int(float(s)) for s in args.sizes.split(",") if s.strip()):
+        csv_path = os.path.join(args.workdir, f"students_{n_rows}_s{args.seed}.csv")
+        if not os.path.exists(csv_path):
+            t0 = time.perf_counter()
+            synthetic_data.write_csv(csv_path, n_rows, seed=args.seed)
+            print(f"generated {n_rows} rows in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_size, args=(os.path.abspath(csv_path), os.path.abspath(args.workdir), n_rows,
+                                                   args.requests, n_rows <= args.train_max_rows, queue))
+        proc.start()
+        steps, failure = _collect(proc, queue, args.timeout_sec)
+        results.append({"rows": n_rows, "steps": steps})
+        if failure:
+            results[-1]["failed"] = failure
+        print(json.dumps(results[-1]), file=sys.stderr)
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "requests": args.requests,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(args.out)
+
+
+if __name__ == "__main__":
+    main()
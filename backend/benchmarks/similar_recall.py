@@ -0,0 +1,86 @@
+# backend/benchmarks/similar_recall.py
+"""
+Recall and latency of the approximate (MinHash/LSH) similar-student search against the
+exact scan.
+
+Queries are skill sets of random dataset rows with one skill dropped or one added. Recall@k
+is tie-aware: an approximate result counts as a hit when its Jaccard reaches the exact
+k-th best score, so swapping between equally similar students is not a miss.
+
+Usage (from backend/):
+    python -m benchmarks.similar_recall --queries 500 --top-k 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opportunity_model as om  # noqa: E402
+
+
+def _sample_queries(n, seed=0):
+    om.load_dataset()
+    rng = random.Random(seed)
+    vocab = sorted(om._skill_vocab)
+    n_rows = om._skill_matrix.shape[0]
+    queries = []
+    while len(queries) < n:
+        skills = om.skills_for_row(rng.randrange(n_rows))
+        if len(skills) > 1 and rng.random() < 0.5:
+            skills.remove(rng.choice(skills))
+        else:
+            skills.append(rng.choice(vocab))
+        queries.append(skills)
+    return queries
+
+
+def _recall(approx, exact):
+    if not exact:
+        return 1.0
+    threshold = exact[-1]["jaccard"]
+    return min(sum(r["jaccard"] >= threshold for r in approx), len(exact)) / len(exact)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--top-k", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    queries = _sample_queries(args.queries)
+    recalls, candidates, lat = [], [], {"approximate": [], "exact": []}
+    for q in queries:
+        t0 = time.perf_counter()
+        approx = om.similar_students(q, args.top_k)
+        t1 = time.perf_counter()
+        exact = om.similar_students(q, args.top_k, exact=True)
+        t2 = time.perf_counter()
+        lat["approximate"].append(t1 - t0)
+        lat["exact"].append(t2 - t1)
+        recalls.append(_recall(approx["students"], exact["students"]))
+        candidates.append(approx["candidates"])
+
+    def pct(xs, p):
+        return round(float(np.percentile(xs, p)) * 1000, 3)
+
+    report = {
+        "rows": int(om._skill_matrix.shape[0]),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "num_perm": om.SIMILAR_NUM_PERM,
+        "bands": om.SIMILAR_BANDS,
+        "mean_recall": round(float(np.mean(recalls)), 4),
+        "min_recall": round(float(np.min(recalls)), 4),
+        "mean_candidate_fraction": round(float(np.mean(candidates)) / max(om._skill_matrix.shape[0], 1), 4),
+        "latency_ms": {mode: {"p50": pct(v, 50), "p99": pct(v, 99)} for mode, v in lat.items()},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# backend/benchmarks/synthetic_data.py
+"""
+Synthetic placement-history generator with the schema of data/students_opportunities.csv.
+
+The per-role structure is fitted from a seed CSV (the bundled one by default):
+  - role frequencies, and per role: skill, company, branch and opportunity-type frequencies
+  - per-role package mean/std, global CGPA mean/std and year frequencies
+Each synthetic row draws a role, then 1-5 skills from that role's skill distribution, which
+keeps the real skill co-occurrence (python with sql and machine learning, react with
+javascript, ...). With probability --tail-prob one extra skill is drawn from a Zipf-distributed
+tail vocabulary of --tail-skills names. Real vocabularies grow with the data, and the tail
+stresses the skill matrix, the inverted index and the stats cube the same way.
+
+Rows are generated and written in chunks, so 10^7 rows need about one chunk of memory.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic_data --rows 1000000 --out /tmp/students_1e6.csv
+"""
+import argparse
+import os
+import sys
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opportunity_model as om  # noqa: E402
+
+MAX_SKILLS = 5
+CHUNK_ROWS = 200_000
+
+
+def _freq(series: pd.Series):
+    counts = series.value_counts()
+    return counts.index.tolist(), (counts / counts.sum()).to_numpy()
+
+
+def fit_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    df = df.copy()
+    df["Skills"] = df["Skills"].fillna("").astype(str)
+    roles, role_p = _freq(df["JobRole"])
+    per_role = []
+    for role in roles:
+        sub = df[df["JobRole"] == role]
+        skills = pd.Series([s for cell in sub["Skills"] for s in om._normalize_skill_string(cell)])
+        per_role.append({
+            "skills": _freq(skills),
+            "companies": _freq(sub["Company"]),
+            "branches": _freq(sub["Branch"]),
+            "types": _freq(sub["OpportunityType"]),
+            "package": (float(sub["Package"].mean()), float(sub["Package"].std(ddof=0)) or 0.5),
+        })
+    return {
+        "roles": roles,
+        "role_p": role_p,
+        "per_role": per_role,
+        "cgpa": (float(df["CGPA"].mean()), float(df["CGPA"].std(ddof=0)) or 0.3),
+        "years": _freq(df["Year"]),
+    }
+
+
+def _sample_skills(rng, names, p, n):
+    """n skill lists of 1..MAX_SKILLS distinct names; the Gumbel top-k trick samples without replacement."""
+    k = min(MAX_SKILLS, len(names))
+    sizes = rng.integers(1, k + 1, size=n)
+    scores = np.log(p)[np.newaxis, :] + rng.gumbel(size=(n, len(names)))
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return [[names[j] for j in top[i, :sizes[i]]] for i in range(n)]
+
+
+def generate_frame(n: int, profile: Dict[str, Any], rng: np.random.Generator, start_roll: int = 1,
+                   tail_skills: int = 2000, tail_prob: float = 0.15) -> pd.DataFrame:
+    role_idx = rng.choice(len(profile["roles"]), size=n, p=profile["role_p"])
+    skills = [None] * n
+    company = np.empty(n, dtype=object)
+    branch = np.empty(n, dtype=object)
+    otype = np.empty(n, dtype=object)
+    package = np.empty(n)
+    for r, prof in enumerate(profile["per_role"]):
+        rows = np.flatnonzero(role_idx == r)
+        if not len(rows):
+            continue
+        for i, lst in zip(rows, _sample_skills(rng, *prof["skills"], len(rows))):
+            skills[i] = lst
+        for out, (names, p) in ((company, prof["companies"]), (branch, prof["branches"]), (otype, prof["types"])):
+            out[rows] = np.asarray(names, dtype=object)[rng.choice(len(names), size=len(rows), p=p)]
+        mean, std = prof["package"]
+        package[rows] = np.round(np.clip(rng.normal(mean, std, size=len(rows)), 2.0, None), 1)
+    if tail_skills > 0:
+        extra = np.flatnonzero(rng.random(n) < tail_prob)
+        ids = np.minimum(rng.zipf(1.3, size=len(extra)), tail_skills) - 1
+        for i, t in zip(extra, ids):
+            skills[i].append(f"skill_{t:05d}")
+    years, year_p = profile["years"]
+    mean, std = profile["cgpa"]
+    rolls = np.arange(start_roll, start_roll + n)
+    return pd.DataFrame({
+        "StudentName": [f"Student{r}" for r in rolls],
+        "RollNumber": rolls,
+        "Branch": branch,
+        "CGPA": np.round(np.clip(rng.normal(mean, std, size=n), 5.0, 10.0), 2),
+        "Skills": [", ".join(lst) for lst in skills],
+        "Company": company,
+        "JobRole": np.asarray(profile["roles"], dtype=object)[role_idx],
+        "Package": package,
+        "Year": np.asarray(years)[rng.choice(len(years), size=n, p=year_p)],
+        "OpportunityType": otype,
+    })
+
+
+def write_csv(path: str, n_rows: int, seed: int = 0, seed_csv: str = None, chunk_rows: int = CHUNK_ROWS,
+              tail_skills: int = 2000, tail_prob: float = 0.15) -> str:
+    """Writes n_rows synthetic rows to `path` chunk by chunk and returns the path."""
+    profile = fit_profile(pd.read_csv(seed_csv or om.DATA_PATH))
+    rng = np.random.default_rng(seed)
+    tmp = path + ".tmp"
+    written = 0
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            frame = generate_frame(n, profile, rng, start_roll=written + 1, tail_skills=tail_skills, tail_prob=tail_prob)
+            frame.to_csv(fh, header=written == 0, index=False)
+            written += n
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=float, required=True, help="number of rows, e.g. 1e6")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--seed-csv", default=None, help="CSV to fit the profile on (default: the bundled dataset)")
+    ap.add_argument("--tail-skills", type=int, default=2000)
+    ap.add_argument("--tail-prob", type=float, default=0.15)
+    args = ap.parse_args(argv)
+    write_csv(args.out, int(args.rows), seed=args.seed, seed_csv=args.seed_csv,
+              tail_skills=args.tail_skills, tail_prob=args.tail_prob)
+    print(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# backend/dataset_cache.py
+"""
+Compiled columnar cache for the placement-history CSV.
+
+The CSV is parsed once and written as plain .npy files:
+  - numeric columns as typed arrays
+  - text columns as int32 category codes plus a categories array (loaded as pandas Categorical)
+  - the skill lists as one flat int32 id array, int64 row offsets and a skill-name array
+    (exactly the CSR indices/indptr of the student-by-skill matrix)
+
+Cache directories are keyed by the SHA-1 of the CSV bytes. A small stamp file remembers the
+CSV's mtime and size so a warm start only stats the file; the hash is recomputed only when the
+stat changes, and a new directory is built only when the content actually changed. Arrays are
+opened with mmap_mode="r", so pages are read lazily.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+# bump when the on-disk layout or the prepare/tokenize logic changes
+CACHE_FORMAT = 1
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def _file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stamp_path(csv_path: str, cache_root: str) -> str:
+    return os.path.join(cache_root, os.path.splitext(os.path.basename(csv_path))[0] + ".stamp.json")
+
+
+def _cache_key(csv_path: str, cache_root: str) -> str:
+    """Content hash of the CSV, reusing the stamped hash while mtime and size are unchanged."""
+    st = os.stat(csv_path)
+    stamp_path = _stamp_path(csv_path, cache_root)
+    try:
+        with open(stamp_path, "r", encoding="utf-8") as fh:
+            stamp = json.load(fh)
+        if stamp.get("mtime_ns") == st.st_mtime_ns and stamp.get("size") == st.st_size:
+            return stamp["sha1"]
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    sha1 = _file_sha1(csv_path)
+    os.makedirs(cache_root, exist_ok=True)
+    tmp = f"{stamp_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": sha1}, fh)
+    os.replace(tmp, stamp_path)
+    return sha1
+
+
+def _save(dirpath: str, name: str, arr: np.ndarray):
+    np.save(os.path.join(dirpath, name + ".npy"), arr, allow_pickle=False)
+
+
+def _write_cache(df: pd.DataFrame, skill_lists, dirpath: str):
+    columns = []
+    for col in df.columns:
+        s = df[col]
+        if s.dtype.kind in "biuf":
+            _save(dirpath, f"col__{col}", s.to_numpy())
+            columns.append({"name": col, "kind": "numeric"})
+        else:
+            cat = pd.Categorical(s)
+            _save(dirpath, f"col__{col}__codes", cat.codes.astype(np.int32))
+            _save(dirpath, f"col__{col}__categories", np.asarray(cat.categories.astype(str), dtype=str))
+            columns.append({"name": col, "kind": "categorical"})
+
+    # skill ids in first-seen order, deduplicated and sorted within each row (CSR layout)
+    vocab: Dict[str, int] = {}
+    ids: List[int] = []
+    offsets = [0]
+    for skills in skill_lists:
+        ids.extend(sorted({vocab.setdefault(sk, len(vocab)) for sk in skills}))
+        offsets.append(len(ids))
+    _save(dirpath, "skill_ids", np.asarray(ids, dtype=np.int32))
+    _save(dirpath, "skill_offsets", np.asarray(offsets, dtype=np.int64))
+    _save(dirpath, "skill_names", np.asarray(list(vocab), dtype=str))
+    with open(os.path.join(dirpath, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump({"format": CACHE_FORMAT, "n_rows": len(df), "columns": columns}, fh)
+
+
+def _read_cache(dirpath: str) -> Dict[str, Any]:
+    def load(name):
+        return np.load(os.path.join(dirpath, name + ".npy"), mmap_mode="r", allow_pickle=False)
+
+    with open(os.path.join(dirpath, "meta.json"), "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+    data = {}
+    for c in meta["columns"]:
+        name = c["name"]
+        if c["kind"] == "numeric":
+            data[name] = load(f"col__{name}")
+        else:
+            data[name] = pd.Categorical.from_codes(load(f"col__{name}__codes"), categories=load(f"col__{name}__categories"))
+    return {
+        "frame": pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]]),
+        "skill_ids": load("skill_ids"),
+        "skill_offsets": load("skill_offsets"),
+        "skill_names": np.asarray(load("skill_names")).tolist(),
+    }
+
+
+def load_columnar(csv_path: str, cache_root: str,
+                  prepare: Callable[[pd.DataFrame], pd.DataFrame],
+                  tokenize: Callable[[str], List[str]],
+                  skill_column: str = "Skills") -> Dict[str, Any]:
+    """
+    Returns {"frame", "skill_ids", "skill_offsets", "skill_names", "key"} for `csv_path`, building the
+    columnar cache first if it is missing or stale. `prepare` cleans the raw CSV frame and
+    `tokenize` splits one skills cell into normalized skill names. "key" is the CSV content hash.
+    """
+    key = _cache_key(csv_path, cache_root)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    dirname = f"{stem}-v{CACHE_FORMAT}-{key[:16]}"
+    dirpath = os.path.join(cache_root, dirname)
+    if not os.path.exists(os.path.join(dirpath, "meta.json")):
+        df = prepare(pd.read_csv(csv_path))
+        staging = os.path.join(cache_root, f"{dirname}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(staging)
+        try:
+            _write_cache(df, (tokenize(s) for s in df[skill_column]), staging)
+            os.rename(staging, dirpath)
+        except OSError:
+            # another worker published the same content first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.exists(os.path.join(dirpath, "meta.json")):
+                raise
+        for old in os.listdir(cache_root):
+            if old.startswith(stem + "-") and old != dirname and not old.endswith(".tmp"):
+                shutil.rmtree(os.path.join(cache_root, old), ignore_errors=True)
+    data = _read_cache(dirpath)
+    data["key"] = key
+    return data
@@ -0,0 +1,90 @@
+# backend/dataset_index.py
+"""
+Per-column indexes over the placement history for server-side filtering.
+
+Equality columns (categoricals such as Branch, and low-cardinality numbers such as Year) are
+stored as postings: the row ids grouped by value in one `order` array, with `offsets[k]` and
+`offsets[k + 1]` bounding the rows of value k. Values are matched case-insensitively.
+
+Range columns (CGPA) keep their values sorted next to the matching row order, so a range is
+two searchsorted calls.
+
+A query intersects the sorted row arrays of its filters, starting with the smallest one.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower()
+
+
+def _postings(codes: np.ndarray, values: List[Any]) -> Dict[str, Any]:
+    codes = np.asarray(codes, dtype=np.int64)
+    # code -1 (missing) is shifted to slot 0 so it sorts first and never matches a value
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    counts = np.bincount(codes + 1, minlength=len(values) + 1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))[1:]
+    lookup: Dict[str, List[int]] = {}
+    for k, v in enumerate(values):
+        lookup.setdefault(_norm(v), []).append(k)
+    return {"kind": "equals", "order": order, "offsets": offsets, "lookup": lookup}
+
+
+def build_indexes(frame: pd.DataFrame, equals_columns: List[str], range_columns: List[str]) -> Dict[str, Any]:
+    indexes = {"n_rows": len(frame), "columns": {}}
+    for col in equals_columns:
+        s = frame[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes, values = s.cat.codes.to_numpy(), list(s.cat.categories)
+        else:
+            values, codes = np.unique(s.to_numpy(), return_inverse=True)
+            values = values.tolist()
+        indexes["columns"][col] = _postings(codes, values)
+    for col in range_columns:
+        vals = frame[col].to_numpy(dtype=np.float64)
+        order = np.argsort(vals, kind="stable").astype(np.int32)
+        indexes["columns"][col] = {"kind": "range", "order": order, "sorted": vals[order]}
+    return indexes
+
+
+def _equals_rows(index: Dict[str, Any], wanted: List[Any]) -> np.ndarray:
+    order, offsets = index["order"], index["offsets"]
+    parts = [order[offsets[k]:offsets[k + 1]] for v in wanted for k in index["lookup"].get(_norm(v), [])]
+    if not parts:
+        return np.empty(0, dtype=np.int32)
+    # postings of one value are already sorted (stable argsort); several values need a merge
+    return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+
+def _range_rows(index: Dict[str, Any], lo: Optional[float], hi: Optional[float]) -> np.ndarray:
+    vals = index["sorted"]
+    start = 0 if lo is None else int(np.searchsorted(vals, lo, side="left"))
+    end = len(vals) if hi is None else int(np.searchsorted(vals, hi, side="right"))
+    return np.sort(index["order"][start:end])
+
+
+def select_rows(indexes: Dict[str, Any], equals: Dict[str, List[Any]],
+                ranges: Dict[str, Tuple[Optional[float], Optional[float]]]) -> np.ndarray:
+    """
+    Sorted row ids matching every filter. `equals` maps a column to accepted values (any of),
+    `ranges` maps a column to an inclusive (min, max) where either end may be None.
+    """
+    candidates = []
+    for col, wanted in equals.items():
+        if wanted:
+            candidates.append(_equals_rows(indexes["columns"][col], wanted))
+    for col, (lo, hi) in ranges.items():
+        if lo is not None or hi is not None:
+            candidates.append(_range_rows(indexes["columns"][col], lo, hi))
+    if not candidates:
+        return np.arange(indexes["n_rows"], dtype=np.int32)
+    candidates.sort(key=len)
+    rows = candidates[0]
+    for other in candidates[1:]:
+        if len(rows) == 0:
+            break
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    return rows
@@ -3,9 +3,14 @@ import os
 import subprocess
 import tempfile
 import uuid
+import wave
+from collections import Counter
+from contextlib import closing
 import ffmpeg
+import numpy as np
 import language_tool_python
-from faster_whisper import WhisperModel
+from job_queue import JobCancelled
+from whisper_pool import WhisperPool
 
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -20,9 +25,21 @@ whisper_model_name = os.getenv("WHISPER_MODEL", "tiny")
 # Auto-detect GPU
 device = "cuda" if os.getenv("USE_CUDA", "false").lower() == "true" else "cpu"
 
-# Load Whisper model
-print(f"Loading Whisper model: {whisper_model_name} on {device}")
-model = WhisperModel(whisper_model_name, device=device, compute_type="int8")
+# Load the Whisper model pool. Unset sizes are derived from the available cores (see whisper_pool):
+#   WHISPER_CONCURRENCY  transcriptions at once, across the sync, streaming and queued routes
+#   WHISPER_CPU_THREADS  threads per transcription
+#   WHISPER_INSTANCES    model copies sharing those slots
+whisper_pool = WhisperPool(
+    whisper_model_name, device=device, compute_type="int8",
+    instances=int(os.getenv("WHISPER_INSTANCES", "1")),
+    slots=int(os.getenv("WHISPER_CONCURRENCY", "0")) or None,
+    cpu_threads=int(os.getenv("WHISPER_CPU_THREADS", "0")) or None,
+)
+WHISPER_CONCURRENCY = whisper_pool.slots
+print(f"Loaded Whisper model: {whisper_model_name} on {device}, {whisper_pool.instances} instance(s) x "
+      f"{whisper_pool.num_workers} worker(s), {whisper_pool.cpu_threads} thread(s) each")
+if os.getenv("WHISPER_WARMUP", "true").lower() == "true":
+    whisper_pool.warm_up()
 
 # --- Helper to save uploaded file ---
 def save_upload(file_storage):
@@ -35,85 +52,194 @@ def save_upload(file_storage):
     file_storage.save(file_path)
     return file_path
 
-# --- Extract audio from video ---
-def extract_audio(video_path):
-    """Extract audio track from video using ffmpeg."""
-    audio_path = os.path.splitext(video_path)[0] + ".wav"
+# --- Decode audio from the upload ---
+SAMPLE_RATE = 16000  # what Whisper expects
+# longer recordings are cut here; the decoded buffer costs 64 KB per second of audio
+MAX_AUDIO_SEC = float(os.getenv("INTERVIEW_MAX_AUDIO_SEC", "3600"))
+_PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def _read_pcm_wav(path):
+    """Samples of a 16 kHz mono PCM WAV as float32 in [-1, 1], or None if the file is anything else."""
+    try:
+        with wave.open(path, "rb") as w:
+            if (w.getnchannels() != 1 or w.getframerate() != SAMPLE_RATE or w.getcomptype() != "NONE"
+                    or w.getsampwidth() not in _PCM_DTYPES):
+                return None
+            width = w.getsampwidth()
+            frames = w.readframes(min(w.getnframes(), int(MAX_AUDIO_SEC * SAMPLE_RATE)))
+    except (wave.Error, EOFError):
+        return None
+    pcm = np.frombuffer(frames, dtype=_PCM_DTYPES[width]).astype(np.float32)
+    if width == 1:
+        return (pcm - 128.0) / 128.0
+    return pcm / float(2 ** (8 * width - 1))
+
+
+def decode_audio(path):
+    """
+    Audio of an upload as a 16 kHz mono float32 array, ready for model.transcribe. 16 kHz mono PCM
+    WAVs are read as they are; anything else is decoded by ffmpeg into a pipe, so nothing else
+    is written to disk.
+    """
+    audio = _read_pcm_wav(path)
+    if audio is not None:
+        return audio
     try:
-        (
+        out, _ = (
             ffmpeg
-            .input(video_path)
-            .output(audio_path, ac=1, ar=16000)
-            .overwrite_output()
-            .run(quiet=True)
+            .input(path)
+            .output("pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=SAMPLE_RATE, t=MAX_AUDIO_SEC)
+            .run(capture_stdout=True, capture_stderr=True)
         )
-        return audio_path
     except ffmpeg.Error as e:
-        raise RuntimeError(f"ffmpeg failed extracting audio: {e.stderr.decode()}")
+        raise RuntimeError(f"ffmpeg failed extracting audio: {e.stderr.decode(errors='replace')}")
+    return np.frombuffer(out, dtype=np.float32)
+
+
+FILLER_WORDS = ["um", "uh", "like", "you know", "actually", "basically"]
+PAUSE_MIN_SEC = 0.3  # gaps between segments shorter than this are not counted as pauses
+_PUNCT = ".,!?;:\"'()[]-\u2026"
+
+
+class TranscriptStats:
+    """
+    Interview statistics updated one transcribed segment at a time. Word count, WPM, pauses and
+    filler counts only look at the new segment, so a progress update costs the same at minute
+    one and minute sixty.
+    """
+
+    def __init__(self):
+        self.texts = []
+        self.word_count = 0
+        self.pauses = 0
+        self.pause_total = 0.0
+        self.last_end = 0.0
+        self.fillers = Counter()
+        self.words = Counter()  # normalized word frequencies, in first-seen order
+        self._prev_word = None  # last word of the previous segment, for two-word fillers
+
+    def add_segment(self, text, start, end):
+        text = text.strip()
+        if text:
+            self.texts.append(text)
+        self.word_count += len(text.split())
+
+        pause = start - self.last_end
+        if pause > PAUSE_MIN_SEC:
+            self.pauses += 1
+            self.pause_total += pause
+        self.last_end = end
+
+        words = [w for w in (t.strip(_PUNCT) for t in text.lower().split()) if w]
+        self.words.update(words)
+        pairs = zip(([self._prev_word] if self._prev_word else []) + words[:-1],
+                    words if self._prev_word else words[1:])
+        self.fillers.update(w for w in words if w in FILLER_WORDS)
+        self.fillers.update(f"{a} {b}" for a, b in pairs if f"{a} {b}" in FILLER_WORDS)
+        if words:
+            self._prev_word = words[-1]
+
+    def _wpm(self, duration_sec):
+        return round((self.word_count / duration_sec) * 60) if duration_sec > 0 else 0
+
+    def filler_counts(self):
+        counts = {fw: self.fillers[fw] for fw in FILLER_WORDS}
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def progress(self, segment_text="", duration_sec=0.0):
+        """Partial result after the latest segment; WPM is measured over the audio heard so far."""
+        return {
+            "elapsed_sec": round(self.last_end, 2),
+            "duration_sec": round(duration_sec, 2),
+            "segment": segment_text.strip(),
+            "word_count": self.word_count,
+            "wpm": self._wpm(self.last_end),
+            "avg_pause_sec": round(self.pause_total / self.pauses, 2) if self.pauses else 0,
+            "filler_counts": self.filler_counts(),
+        }
+
+    def result(self, duration_sec):
+        """Final analysis for the whole recording; runs the grammar check once over the transcript."""
+        transcript_text = " ".join(self.texts).strip()
+        wpm = self._wpm(duration_sec)
+        filler_counts = self.filler_counts()
+
+        matches = tool.check(transcript_text)
+        grammar_matches = []
+        for m in matches:
+            grammar_matches.append({
+                "message": m.message,
+                "snippet": m.context,
+                "replacements": m.replacements
+            })
+
+        # Simple fluency scoring
+        fluency_score = 100
+        fluency_score -= filler_counts["total"] * 2
+        fluency_score -= len(matches) * 1.5
+        if wpm < 90 or wpm > 160:
+            fluency_score -= 5
+        fluency_score = max(0, min(100, round(fluency_score)))
+
+        # Suggest synonyms for repeated words
+        synonym_suggestions = [f"Consider replacing '{word}' with alternatives."
+                               for word, n in self.words.items() if n > 5 and word.isalpha() and len(word) > 3]
+
+        return {
+            "fluency_score": fluency_score,
+            "wpm": wpm,
+            "duration_sec": round(duration_sec, 2),
+            "avg_pause_sec": round(self.pause_total / self.pauses, 2) if self.pauses else 0,
+            "transcript": transcript_text,
+            "grammar_matches": grammar_matches,
+            "filler_counts": filler_counts,
+            "synonym_suggestions": synonym_suggestions
+        }
+
 
 # --- Analyze uploaded file ---
+def iter_analysis(file_path):
+    """
+    Transcribes in a single pass over Whisper's segment generator, yielding ("progress", partial)
+    after every segment and finally ("result", analysis). The Whisper slot is released once the
+    segments are consumed, so the grammar check in stats.result() does not hold up queued jobs.
+    """
+    audio = decode_audio(file_path)
+    stats = TranscriptStats()
+    with whisper_pool.acquire() as model:
+        segments, info = model.transcribe(audio)
+        for seg in segments:
+            stats.add_segment(seg.text, seg.start, seg.end)
+            yield "progress", stats.progress(seg.text, info.duration)
+    yield "result", stats.result(info.duration)
+
+
 def analyze_file(file_path):
     """Perform speech-to-text, filler detection, grammar check, and scoring."""
-    # 1. Extract audio
-    audio_path = extract_audio(file_path)
-
-    # 2. Transcribe using Whisper
-    segments, info = model.transcribe(audio_path)
-    transcript_text = " ".join([seg.text.strip() for seg in segments]).strip()
-
-    # 3. Calculate WPM & duration
-    word_count = len(transcript_text.split())
-    duration_sec = info.duration
-    wpm = round((word_count / duration_sec) * 60) if duration_sec > 0 else 0
-
-    # 4. Avg pause length
-    pauses = []
-    last_end = 0
-    for seg in segments:
-        pause = seg.start - last_end
-        if pause > 0.3:
-            pauses.append(pause)
-        last_end = seg.end
-    avg_pause_sec = round(sum(pauses) / len(pauses), 2) if pauses else 0
-
-    # 5. Detect filler words
-    filler_words = ["um", "uh", "like", "you know", "actually", "basically"]
-    filler_counts = {fw: transcript_text.lower().split().count(fw) for fw in filler_words}
-    filler_counts["total"] = sum(filler_counts.values())
-
-    # 6. Grammar check
-    matches = tool.check(transcript_text)
-    grammar_matches = []
-    for m in matches:
-        grammar_matches.append({
-            "message": m.message,
-            "snippet": m.context,
-            "replacements": m.replacements
-        })
-
-    # 7. Simple fluency scoring
-    fluency_score = 100
-    fluency_score -= filler_counts["total"] * 2
-    fluency_score -= len(matches) * 1.5
-    if wpm < 90 or wpm > 160:
-        fluency_score -= 5
-    fluency_score = max(0, min(100, round(fluency_score)))
-
-    # 8. Suggest synonyms for repeated words
-    synonym_suggestions = []
-    words = transcript_text.lower().split()
-    for word in set(words):
-        if words.count(word) > 5 and word.isalpha() and len(word) > 3:
-            synonym_suggestions.append(f"Consider replacing '{word}' with alternatives.")
-
-    # 9. Return analysis result
-    return {
-        "fluency_score": fluency_score,
-        "wpm": wpm,
-        "duration_sec": round(duration_sec, 2),
-        "avg_pause_sec": avg_pause_sec,
-        "transcript": transcript_text,
-        "grammar_matches": grammar_matches,
-        "filler_counts": filler_counts,
-        "synonym_suggestions": synonym_suggestions
-    }
+    analysis = None
+    for kind, payload in iter_analysis(file_path):
+        if kind == "result":
+            analysis = payload
+    return analysis
+
+
+def analyze_job(file_path, progress=None, cancel_event=None):
+    """
+    analyze_file as a job_queue.JobQueue callable: reports progress, publishes every partial
+    result as a job event and stops between segments when cancelled.
+    """
+    with closing(iter_analysis(file_path)) as steps:
+        for kind, payload in steps:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled()
+            if kind == "result":
+                return payload
+            if progress is not None:
+                duration = payload["duration_sec"]
+                if duration > 0:
+                    progress(0.95 * payload["elapsed_sec"] / duration,
+                             f"{payload['elapsed_sec']:.0f}s of {duration:.0f}s transcribed", event=payload)
+                else:
+                    progress(0.0, event=payload)
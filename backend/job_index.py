@@ -0,0 +1,174 @@
+# backend/job_index.py
+"""
+In-memory BM25 index over job postings, for ranking jobs against resume text.
+
+Each posting is tokenized per field and the field term counts are weighted (skills count three
+times, the role twice, company, location and description once) before the usual BM25
+saturation, a simple form of BM25F. Postings lists are append-only arrays of
+(job position, weighted term frequency), so adding a job is O(its terms) and never touches
+the other postings. A query walks only the postings of terms that occur in the resume and
+accumulates scores into one dense float array over the jobs.
+
+The index lives in the web process. It is filled once from the jobs collection, updated on
+every create_job, and callers can catch up with jobs inserted by other processes through
+`last_id`, falling back to `missing` for jobs whose _id sorts below it (see app.py).
+"""
+import math
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {"skills": 3.0, "jobRole": 2.0, "companyName": 1.0, "location": 1.0, "description": 1.0}
+# fields returned with each match
+JOB_FIELDS = ("companyName", "jobRole", "location", "skills", "description")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to was were will with you your "
+    "we i my me".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps +, # and inner dots so c++, c# and node.js survive."""
+    tokens = []
+    for tok in _TOKEN.findall(str(text or "").lower()):
+        tok = tok.rstrip(".")
+        if tok and tok not in _STOPWORDS:
+            tokens.append(tok)
+    return tokens
+
+
+def normalize_skills(value) -> List[str]:
+    """Skills from a list or a comma/semicolon separated string, stripped and de-duplicated."""
+    if not value:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else re.split(r"[,;\n]", str(value))
+    return list(dict.fromkeys(s.strip() for s in map(str, parts) if s.strip()))
+
+
+class JobIndex:
+    def __init__(self, k1: float = K1, b: float = B):
+        self.k1 = k1
+        self.b = b
+        self.last_id = None  # highest Mongo _id read by build/catch-up, see add()
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._jobs: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._terms: Dict[str, int] = {}
+        self._post_jobs: List[array] = []   # per term: job positions, ascending
+        self._post_tf: List[array] = []     # per term: weighted term frequency
+        self._lengths = array("f")
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def build(self, jobs: Iterable[Dict[str, Any]]):
+        """Replaces the index contents with `jobs` (Mongo documents)."""
+        with self._lock:
+            self._reset()
+            self.last_id = None
+            for job in jobs:
+                self._add(job, True)
+
+    def add(self, job: Dict[str, Any], advance: bool = False) -> bool:
+        """
+        Indexes one job document; returns False if its _id is already indexed. `advance` moves
+        `last_id` forward and is meant for jobs read back from the collection in _id order. Jobs
+        this process just inserted leave it alone, so a catch-up still finds the jobs other
+        processes inserted in the meantime.
+        """
+        with self._lock:
+            return self._add(job, advance)
+
+    def _add(self, job: Dict[str, Any], advance: bool) -> bool:
+        if advance and job.get("_id") is not None and (self.last_id is None or job["_id"] > self.last_id):
+            self.last_id = job["_id"]
+        key = str(job.get("_id")) if job.get("_id") is not None else f"#{len(self._jobs)}"
+        if key in self._positions:
+            return False
+        doc = {f: job.get(f) for f in JOB_FIELDS if job.get(f) is not None}
+        if "skills" in doc:
+            doc["skills"] = normalize_skills(doc["skills"])
+        doc["id"] = key
+        pos = len(self._jobs)
+        self._jobs.append(doc)
+        self._positions[key] = pos
+
+        weighted: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = job.get(field)
+            if not value:
+                continue
+            text = " ".join(normalize_skills(value)) if field == "skills" else value
+            for tok in tokenize(text):
+                weighted[tok] = weighted.get(tok, 0.0) + weight
+        length = sum(weighted.values())
+        self._lengths.append(length)
+        self._total_length += length
+        for tok, tf in weighted.items():
+            tid = self._terms.get(tok)
+            if tid is None:
+                tid = self._terms[tok] = len(self._post_jobs)
+                self._post_jobs.append(array("i"))
+                self._post_tf.append(array("f"))
+            self._post_jobs[tid].append(pos)
+            self._post_tf[tid].append(tf)
+        return True
+
+    def missing(self, ids: Iterable[Any]) -> List[Any]:
+        """The ids among `ids` that are not indexed yet."""
+        with self._lock:
+            return [i for i in ids if str(i) not in self._positions]
+
+    def search(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top-k jobs for a resume text by BM25 score: [{"score", "job", "matched_skills"}, ...].
+        Each distinct resume term counts once, so long resumes repeating a word are not favoured.
+        """
+        query = set(tokenize(text))
+        with self._lock:
+            n = len(self._jobs)
+            if not n or not query or top_k <= 0:
+                return []
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n or 1.0))
+            scores = np.zeros(n, dtype=np.float32)
+            for tok in query:
+                tid = self._terms.get(tok)
+                if tid is None:
+                    continue
+                jobs = np.frombuffer(self._post_jobs[tid], dtype=np.int32)
+                tf = np.frombuffer(self._post_tf[tid], dtype=np.float32)
+                idf = math.log(1 + (n - len(jobs) + 0.5) / (len(jobs) + 0.5))
+                # positions within one postings list are unique, so fancy-index += is exact
+                scores[jobs] += idf * tf * (self.k1 + 1) / (tf + norm[jobs])
+                del jobs, tf  # release the buffer exports before the arrays can grow again
+            del lengths
+            hits = np.flatnonzero(scores)
+            if len(hits) > top_k:
+                hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+            # ties broken by posting order, so results are deterministic
+            hits = hits[np.lexsort((hits, -scores[hits]))]
+            found = [(float(scores[i]), self._jobs[i]) for i in hits]
+        return [{"score": round(score, 4), "job": job,
+                 "matched_skills": [s for s in normalize_skills(job.get("skills"))
+                                    if set(tokenize(s)) and set(tokenize(s)) <= query]}
+                for score, job in found]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._post_jobs),
+                "avg_length": round(self._total_length / len(self._jobs), 2) if self._jobs else 0.0,
+            }
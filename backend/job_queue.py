@@ -0,0 +1,186 @@
+# backend/job_queue.py
+"""
+Small in-process background job queue.
+
+Work is submitted as a callable, runs on a bounded thread pool, and is tracked by a job id
+that HTTP endpoints can poll. The callable receives two keyword arguments:
+  - progress(fraction, message=None, event=None): report progress in [0, 1]; a non-None
+    `event` is appended to the job's event log, which events() hands out in order
+  - cancel_event: a threading.Event that is set when the job is cancelled; long-running work
+    should check it between steps and raise JobCancelled.
+
+Finished jobs (succeeded, failed, cancelled) are kept for `retention_sec` seconds.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised by job callables that stop early because their cancel_event was set."""
+
+
+class JobQueue:
+    def __init__(self, name: str, max_workers: int = 1, retention_sec: float = 3600.0):
+        self.name = name
+        self.max_workers = max_workers
+        self.retention_sec = retention_sec
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)  # notified on progress events and when a job ends
+
+    def submit(self, fn: Callable[..., Any], *args, cleanup: Callable[[], None] = None, **kwargs) -> str:
+        """
+        Queues fn(*args, **kwargs). `cleanup` runs exactly once when the job is over, whether it
+        ran or was cancelled while still queued (e.g. to delete an uploaded file).
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": QUEUED,
+            "progress": 0.0,
+            "message": None,
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "_cancel": threading.Event(),
+            "_future": None,
+            "_cleanup": cleanup,
+            "_events": [],
+        }
+        job["_future"] = self._executor.submit(self._run, job, fn, args, kwargs)
+        with self._lock:
+            self._purge_locked()
+            self._jobs[job_id] = job
+        return job_id
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job["status"] != QUEUED:
+                return  # cancelled while queued; cancel() ran the cleanup
+            job["status"] = RUNNING
+            job["started_at"] = time.time()
+            self._changed.notify_all()
+        try:
+            self._call(job, fn, args, kwargs)
+        finally:
+            self._cleanup(job)
+
+    @staticmethod
+    def _cleanup(job):
+        if job["_cleanup"] is not None:
+            try:
+                job["_cleanup"]()
+            except Exception:
+                pass
+
+    def _call(self, job, fn, args, kwargs):
+        def progress(fraction: float, message: Optional[str] = None, event: Any = None):
+            with self._lock:
+                job["progress"] = round(max(0.0, min(1.0, float(fraction))), 4)
+                if message is not None:
+                    job["message"] = message
+                if event is not None:
+                    job["_events"].append(event)
+                    self._changed.notify_all()
+
+        try:
+            result = fn(*args, progress=progress, cancel_event=job["_cancel"], **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            self._finish(job, FAILED, error=str(e))
+        else:
+            self._finish(job, SUCCEEDED, result=result)
+
+    def _finish(self, job, status, result=None, error=None):
+        with self._lock:
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = time.time()
+            if status == SUCCEEDED:
+                job["progress"] = 1.0
+            self._changed.notify_all()
+
+    def _purge_locked(self):
+        cutoff = time.time() - self.retention_sec
+        for job_id in [j["id"] for j in self._jobs.values() if j["status"] in FINISHED and j["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge_locked()
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """Blocks until the job is over or `timeout` seconds have passed, then returns its state."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        wait_futures([job["_future"]], timeout)
+        with self._lock:
+            return self._public(job)
+
+    def events(self, job_id: str, after: int = 0,
+               timeout: float = None) -> Tuple[Optional[Dict[str, Any]], List[Any]]:
+        """
+        Progress events past the first `after`, waiting up to `timeout` seconds while there are
+        none, the job is not over and its status is unchanged. Returns (state, new events);
+        (None, []) for an unknown job.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None, []
+            status = job["status"]
+            self._changed.wait_for(lambda: len(job["_events"]) > after or job["status"] in FINISHED
+                                   or job["status"] != status, timeout)
+            return self._public(job), job["_events"][after:]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancels a queued job immediately; a running job is asked to stop via its cancel_event."""
+        cleanup = False
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] == QUEUED:
+                job["_future"].cancel()
+                job["status"] = CANCELLED
+                job["finished_at"] = time.time()
+                self._changed.notify_all()
+                cleanup = True
+            elif job["status"] == RUNNING:
+                job["_cancel"].set()
+                job["message"] = "cancelling"
+            public = self._public(job)
+        if cleanup:
+            self._cleanup(job)
+        return public
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge_locked()
+            counts = {s: 0 for s in (QUEUED, RUNNING) + FINISHED}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+            return {"name": self.name, "max_workers": self.max_workers, "queue_depth": counts[QUEUED], "jobs": counts}
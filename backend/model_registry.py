@@ -0,0 +1,202 @@
+# backend/model_registry.py
+"""
+Versioned, memory-mappable storage for the opportunity models.
+
+Layout under the model directory:
+    versions/<version>/opportunity_model.joblib   forests + MultiLabelBinarizer + feature columns
+    versions/<version>/features.json              feature columns, readable without unpickling
+    versions/<version>/compiled/*.npy             tree_engine arrays, one .npy per array
+    CURRENT                                        name of the live version, replaced atomically
+
+The compiled arrays are opened with mmap_mode="r", so every worker process maps the same
+pages from the OS page cache instead of holding a private copy. The joblib forests cannot be
+shared that way: sklearn trees copy their node arrays on unpickle, memory-mapped or not, so
+each process that loads them pays their full size. With the "compiled" backend they are only
+loaded if a batch is too large for the compiled path.
+
+Each process re-reads CURRENT at most every RELOAD_CHECK_SEC seconds. A new version is loaded
+completely before it is published with a single reference assignment, so a request either sees
+the old bundle or the new one, never a mix.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+import joblib
+
+from tree_engine import compile_forests, save_compiled, load_compiled
+
+ARTIFACT_NAME = "opportunity_model.joblib"
+RELOAD_CHECK_SEC = float(os.getenv("OPPORTUNITY_MODEL_RELOAD_SEC", "2"))
+KEEP_VERSIONS = int(os.getenv("OPPORTUNITY_MODEL_KEEP_VERSIONS", "3"))
+
+_bundle = None              # the live model bundle, replaced wholesale on reload
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def _versions_dir(model_dir: str) -> str:
+    return os.path.join(model_dir, "versions")
+
+
+def _pointer_path(model_dir: str) -> str:
+    return os.path.join(model_dir, "CURRENT")
+
+
+def current_version(model_dir: str) -> Optional[str]:
+    try:
+        with open(_pointer_path(model_dir), "r", encoding="utf-8") as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_pointer(model_dir: str, version: str):
+    tmp = f"{_pointer_path(model_dir)}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(version)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, _pointer_path(model_dir))
+
+
+def _new_version() -> str:
+    # sorts by publish time: seconds plus nanoseconds, then a random suffix against collisions
+    now = time.time_ns()
+    return time.strftime("%Y%m%dT%H%M%S", time.localtime(now // 10 ** 9)) + f".{now % 10 ** 9:09d}-" + uuid.uuid4().hex[:6]
+
+
+def _prune(model_dir: str, keep_version: str):
+    """
+    Deletes all but the newest KEEP_VERSIONS versions, never `keep_version` or the one CURRENT
+    names (another process may have published since). Bundles still serving an older version
+    hold their forests in memory or keep the joblib file open (see _load_version), so deleting
+    the directory under them does not break a later lazy load.
+    """
+    root = _versions_dir(model_dir)
+    versions = sorted(v for v in os.listdir(root) if not v.endswith(".tmp"))
+    protected = {keep_version, current_version(model_dir)}
+    for v in versions[:-KEEP_VERSIONS] if KEEP_VERSIONS > 0 else []:
+        if v not in protected:
+            # open maps keep working on POSIX; on Windows a mapped file just survives until next prune
+            shutil.rmtree(os.path.join(root, v), ignore_errors=True)
+
+
+def publish(model_dir: str, models: Dict[str, Any], mlb, feature_columns, use_compiled: bool) -> Dict[str, Any]:
+    """Writes a new version directory, flips CURRENT to it and makes it the live bundle."""
+    global _bundle, _last_check
+    version = _new_version()
+    root = _versions_dir(model_dir)
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, version + ".tmp")
+    os.makedirs(staging)
+    feature_index = {c: i for i, c in enumerate(feature_columns)}
+    joblib.dump({"models": models, "mlb": mlb, "feature_columns": feature_columns, "feature_index": feature_index},
+                os.path.join(staging, ARTIFACT_NAME))
+    with open(os.path.join(staging, "features.json"), "w", encoding="utf-8") as fh:
+        json.dump(feature_columns, fh)
+    save_compiled(compile_forests(models), os.path.join(staging, "compiled"))
+    final = os.path.join(root, version)
+    os.rename(staging, final)
+    _write_pointer(model_dir, version)
+
+    bundle = {
+        "version": version,
+        "dir": final,
+        "models": models,
+        "mlb": mlb,
+        "feature_columns": feature_columns,
+        "feature_index": feature_index,
+        "compiled": load_compiled(os.path.join(final, "compiled")) if use_compiled else None,
+    }
+    with _lock:
+        _bundle = bundle
+        _last_check = time.monotonic()
+    _prune(model_dir, version)
+    return bundle
+
+
+def _load_version(model_dir: str, version: str, use_compiled: bool) -> Dict[str, Any]:
+    vdir = os.path.join(_versions_dir(model_dir), version)
+    bundle = {"version": version, "dir": vdir, "models": None, "mlb": None}
+    if use_compiled:
+        with open(os.path.join(vdir, "features.json"), "r", encoding="utf-8") as fh:
+            bundle["feature_columns"] = json.load(fh)
+        bundle["compiled"] = load_compiled(os.path.join(vdir, "compiled"))
+        # held open for bundle_models: the forests stay loadable if _prune deletes the version first
+        bundle["artifact"] = open(os.path.join(vdir, ARTIFACT_NAME), "rb")
+    else:
+        saved = joblib.load(os.path.join(vdir, ARTIFACT_NAME))
+        bundle.update(models=saved["models"], mlb=saved["mlb"], feature_columns=saved["feature_columns"], compiled=None)
+    bundle["feature_index"] = {c: i for i, c in enumerate(bundle["feature_columns"])}
+    return bundle
+
+
+def _load_legacy(path: str, use_compiled: bool) -> Dict[str, Any]:
+    """Artifacts written before versioning: a single joblib file, no compiled arrays on disk."""
+    saved = joblib.load(path)
+    feature_columns = saved["feature_columns"]
+    return {
+        "version": f"legacy-{int(os.path.getmtime(path))}",
+        "dir": os.path.dirname(path),
+        "models": saved["models"],
+        "mlb": saved["mlb"],
+        "feature_columns": feature_columns,
+        "feature_index": saved.get("feature_index") or {c: i for i, c in enumerate(feature_columns)},
+        "compiled": compile_forests(saved["models"]) if use_compiled else None,
+    }
+
+
+def current_bundle(model_dir: str, legacy_path: str, use_compiled: bool) -> Dict[str, Any]:
+    """
+    Returns the live bundle, swapping in a newer version if CURRENT moved. While one thread is
+    loading a new version, other threads keep being served the old bundle instead of waiting.
+    """
+    global _bundle, _last_check
+    bundle = _bundle
+    if bundle is not None and time.monotonic() - _last_check < RELOAD_CHECK_SEC:
+        return bundle
+    if not _lock.acquire(blocking=bundle is None):
+        return bundle
+    try:
+        _last_check = time.monotonic()
+        version = current_version(model_dir)
+        if version is None:
+            if not os.path.exists(legacy_path):
+                raise FileNotFoundError("Model not found. Train first.")
+            version = f"legacy-{int(os.path.getmtime(legacy_path))}"
+            if _bundle is None or _bundle["version"] != version:
+                _bundle = _load_legacy(legacy_path, use_compiled)
+        elif _bundle is None or _bundle["version"] != version:
+            _bundle = _load_version(model_dir, version, use_compiled)
+        return _bundle
+    finally:
+        _lock.release()
+
+
+def bundle_models(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """The sklearn forests of a bundle, unpickled on first use when only compiled arrays were loaded."""
+    if bundle["models"] is None:
+        with _lock:
+            if bundle["models"] is None:
+                artifact = bundle.pop("artifact", None)
+                if artifact is None:
+                    saved = joblib.load(os.path.join(bundle["dir"], ARTIFACT_NAME))
+                else:
+                    with artifact:
+                        saved = joblib.load(artifact)
+                bundle["mlb"] = saved["mlb"]
+                bundle["models"] = saved["models"]
+    return bundle["models"]
+
+
+def reset():
+    """Forgets the live bundle so the next current_bundle() call reloads from disk."""
+    global _bundle, _last_check
+    with _lock:
+        _bundle = None
+        _last_check = 0.0
@@ -1,22 +1,75 @@
 # backend/opportunity_model.py
 import os
 import re
+import json
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-import joblib
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.preprocessing import MultiLabelBinarizer
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator
+from tree_engine import predict_compiled
+import model_registry
+import dataset_cache
+import stats_cube
+import dataset_index
+from minhash_lsh import MinHashLSH
+from result_cache import make_cache
+from job_queue import JobCancelled
 
 ROOT = os.path.dirname(__file__)
 DATA_PATH = os.path.join(ROOT, "data", "students_opportunities.csv")
+DATA_CACHE_DIR = os.path.join(ROOT, "data", ".cache")
 MODEL_DIR = os.path.join(ROOT, "models")
+# pre-versioning artifact location, still loaded when models/CURRENT does not exist yet
 MODEL_PATH = os.path.join(MODEL_DIR, "opportunity_model.joblib")
+# "compiled" (default; flattened forests from tree_engine, memory-mapped and shared between
+# worker processes) or "sklearn" (every process unpickles a private copy of the forests)
+INFERENCE_BACKEND = os.getenv("OPPORTUNITY_INFERENCE_BACKEND", "compiled").strip().lower()
+# the compiled traversal wins on request-sized batches; sklearn's Cython trees win on large ones
+COMPILED_MAX_BATCH = int(os.getenv("OPPORTUNITY_COMPILED_MAX_BATCH", "512"))
+N_ESTIMATORS = 200
+# forests are grown this many trees at a time so training can report progress and be cancelled
+TRAIN_STEP_TREES = 25
+# joblib n_jobs for tree building, summed over the forests fitted side by side; -1 splits the
+# available cores between them so the three fits do not oversubscribe the machine
+TRAIN_N_JOBS = int(os.getenv("OPPORTUNITY_TRAIN_N_JOBS", "-1"))
+# recommend_from_trends ranks this many pages ahead and keeps the window for cursor paging
+RANK_PREFETCH_PAGES = 5
+RANK_CACHE_SIZE = 256
+RESULT_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL_SEC = float(os.getenv("RECOMMEND_CACHE_TTL_SEC", "300"))
+# CGPA is rounded to this step before scoring, so everyone in a bucket shares one cached result
+CGPA_BUCKET = float(os.getenv("RECOMMEND_CGPA_BUCKET", "0.01"))
+# dataset export: filterable columns and rows per streamed chunk
+EXPORT_EQUALS_COLUMNS = ("Branch", "Year", "Company", "JobRole", "OpportunityType")
+EXPORT_RANGE_COLUMNS = ("CGPA",)
+EXPORT_CHUNK_SIZE = 1000
+# MinHash/LSH index for approximate similar-student search (see minhash_lsh for the trade-off)
+SIMILAR_NUM_PERM = int(os.getenv("SIMILAR_NUM_PERM", "32"))
+SIMILAR_BANDS = int(os.getenv("SIMILAR_BANDS", "16"))
 
-_model_store = None
-_mlb = None
-_feature_columns = None
+_row_local = threading.local()  # per-thread preallocated single-row input buffer
 _df_cache = None
+_skill_matrix = None   # CSR student-by-skill incidence matrix, one row per dataset row
+_skill_names = None    # column index -> skill name
+_skill_vocab = None    # skill name -> column index in _skill_matrix
+_branch_norm = None    # stripped, lower-cased Branch values aligned with dataset rows
+_skill_index = None    # skill -> {"rows": sorted row ids, "roles": distinct JobRoles, "companies": distinct Companies}
+_stats_cube = None     # stats_cube tables: per-skill and per-skill-pair counts, package sums, company/role counts
+_record_columns = None # column -> values array, or (codes, categories) for categoricals; used to build result records
+_similar_index = None  # MinHashLSH over the skill sets of _skill_matrix rows
+_column_indexes = None # dataset_index postings for EXPORT_EQUALS_COLUMNS and sorted orders for EXPORT_RANGE_COLUMNS
+_dataset_version = None  # content hash of the loaded CSV; cursors and cached results are tied to it
+_rank_cache = OrderedDict()  # query fingerprint -> ranked window, LRU bounded by RANK_CACHE_SIZE
+_rank_lock = threading.Lock()
+_result_cache = make_cache("recommend", RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SEC)
 
 def _normalize_skill_string(s: str) -> List[str]:
     if not isinstance(s, str):
@@ -25,34 +78,176 @@ def _normalize_skill_string(s: str) -> List[str]:
     parts = [p.strip().lower() for p in parts if p and p.strip()]
     return parts
 
-def load_dataset() -> pd.DataFrame:
-    global _df_cache
-    if _df_cache is not None:
-        return _df_cache
-    if not os.path.exists(DATA_PATH):
-        raise FileNotFoundError(f"Dataset not found at: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
+_REQUIRED_COLUMNS = {"StudentName","RollNumber","Branch","CGPA","Skills","Company","JobRole","Package","Year","OpportunityType"}
+
+def _prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = [c.strip() for c in df.columns]
-    required = {"StudentName","RollNumber","Branch","CGPA","Skills","Company","JobRole","Package","Year","OpportunityType"}
-    if not required.issubset(set(df.columns)):
-        missing = required - set(df.columns)
+    if not _REQUIRED_COLUMNS.issubset(set(df.columns)):
+        missing = _REQUIRED_COLUMNS - set(df.columns)
         raise ValueError(f"CSV is missing required columns: {missing}")
     df["Skills"] = df["Skills"].fillna("").astype(str)
     df["Branch"] = df["Branch"].fillna("").astype(str)
     df["CGPA"] = pd.to_numeric(df["CGPA"], errors="coerce").fillna(0.0)
     df["Package"] = pd.to_numeric(df["Package"], errors="coerce").fillna(0.0)
     df["Year"] = pd.to_numeric(df["Year"], errors="coerce").fillna(0).astype(int)
-    df["_skill_list"] = df["Skills"].apply(_normalize_skill_string)
+    return df
+
+def load_dataset() -> pd.DataFrame:
+    """
+    Returns the placement history with text columns as categoricals. Skill lists are not kept
+    as a column; they live in _skill_matrix (see skills_for_row).
+    """
+    global _df_cache, _dataset_version
+    if _df_cache is not None:
+        return _df_cache
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"Dataset not found at: {DATA_PATH}")
+    data = dataset_cache.load_columnar(DATA_PATH, DATA_CACHE_DIR, _prepare_frame, _normalize_skill_string)
+    df = data["frame"]
+    _build_skill_matrix(df, data["skill_ids"], data["skill_offsets"], data["skill_names"])
+    _build_skill_index(df)
+    _build_stats_cube(df)
+    _build_record_columns(df)
+    _build_column_indexes(df)
+    _build_similar_index()
+    with _rank_lock:
+        _rank_cache.clear()
+    if _dataset_version is not None and _dataset_version != data["key"]:
+        _result_cache.clear()
+    _dataset_version = data["key"]
     _df_cache = df
     return _df_cache
 
-# --- training and model persistence (unchanged from before) ---
-def train_model(random_state=42):
-    global _model_store, _mlb, _feature_columns
+def reload_dataset() -> pd.DataFrame:
+    """Drops the cached dataset and re-reads it, rebuilding every structure derived from it."""
+    global _df_cache
+    _df_cache = None
+    return load_dataset()
+
+def _build_skill_matrix(df: pd.DataFrame, skill_ids: np.ndarray, skill_offsets: np.ndarray, skill_names: List[str]):
+    """Wraps the cached skill id/offset arrays as the sparse student-by-skill incidence matrix."""
+    global _skill_matrix, _skill_names, _skill_vocab, _branch_norm
+    data = np.ones(len(skill_ids), dtype=np.int32)
+    _skill_matrix = sparse.csr_matrix((data, skill_ids, skill_offsets), shape=(len(df), len(skill_names)))
+    _skill_names = skill_names
+    _skill_vocab = {name: i for i, name in enumerate(skill_names)}
+    branch = df["Branch"].cat
+    _branch_norm = pd.Index(branch.categories).str.strip().str.lower().to_numpy()[branch.codes]
+
+def skills_for_row(row: int) -> List[str]:
+    """Normalized, de-duplicated skill names of one dataset row."""
+    load_dataset()
+    start, end = _skill_matrix.indptr[row], _skill_matrix.indptr[row + 1]
+    return [_skill_names[i] for i in _skill_matrix.indices[start:end]]
+
+def _build_skill_index(df: pd.DataFrame):
+    """Builds the inverted skill index (posting lists + distinct roles/companies) from _skill_matrix."""
+    global _skill_index
+    csc = _skill_matrix.tocsc()
+    csc.sort_indices()
+    roles = df["JobRole"].astype(str).to_numpy()
+    companies = df["Company"].astype(str).to_numpy()
+    index = {}
+    for skill, col in _skill_vocab.items():
+        rows = csc.indices[csc.indptr[col]:csc.indptr[col + 1]]
+        index[skill] = {"rows": rows, "roles": frozenset(roles[rows]), "companies": frozenset(companies[rows])}
+    _skill_index = index
+
+def _build_stats_cube(df: pd.DataFrame):
+    global _stats_cube
+    _stats_cube = stats_cube.build_stats_cube(
+        _skill_matrix, df["Company"].cat.codes.to_numpy(), df["JobRole"].cat.codes.to_numpy(),
+        df["Package"].to_numpy(dtype=float),
+        [str(c) for c in df["Company"].cat.categories], [str(c) for c in df["JobRole"].cat.categories])
+
+def _build_record_columns(df: pd.DataFrame):
+    global _record_columns
+    cols = {}
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            cols[c] = (df[c].cat.codes.to_numpy(), [str(v) for v in df[c].cat.categories])
+        else:
+            cols[c] = df[c].to_numpy()
+    _record_columns = cols
+
+def _build_column_indexes(df: pd.DataFrame):
+    global _column_indexes
+    _column_indexes = dataset_index.build_indexes(df, list(EXPORT_EQUALS_COLUMNS), list(EXPORT_RANGE_COLUMNS))
+
+def _build_similar_index():
+    # Records only enter the dataset through a CSV (re)load, and load_dataset rebuilds every
+    # derived structure, so the index is rebuilt with them; MinHashLSH.add is not used here.
+    # A path that appends rows without a reload must call _similar_index.add for them too.
+    global _similar_index
+    index = MinHashLSH(num_perm=SIMILAR_NUM_PERM, bands=SIMILAR_BANDS)
+    index.build(_skill_matrix.indptr, _skill_matrix.indices)
+    _similar_index = index
+
+def _column_values(name: str, rows: np.ndarray) -> list:
+    col = _record_columns[name]
+    if isinstance(col, tuple):
+        codes, categories = col
+        return [categories[k] if k >= 0 else None for k in codes[rows]]
+    return col[rows].tolist()
+
+def rows_with_skill(skill: str) -> np.ndarray:
+    """Returns the sorted dataset row ids whose skill list contains `skill`."""
+    load_dataset()
+    entry = _skill_index.get(str(skill).strip().lower())
+    return entry["rows"] if entry else np.empty(0, dtype=np.int32)
+
+def rows_with_any_skill(skills: List[str]) -> np.ndarray:
+    """Returns the sorted dataset row ids containing at least one of `skills`."""
+    postings = [rows_with_skill(s) for s in skills if s and isinstance(s, str)]
+    if not postings:
+        return np.empty(0, dtype=np.int32)
+    return np.unique(np.concatenate(postings))
+
+# --- training and model persistence ---
+def _fit_forest(model, X, y, on_trees, cancel_event):
+    """
+    Grows `model` TRAIN_STEP_TREES trees at a time with warm_start. sklearn draws the same
+    per-tree seeds either way, so the result is identical to a single fit().
+    """
+    target = model.n_estimators
+    built = 0
+    model.set_params(warm_start=True)
+    while built < target:
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled()
+        step = min(TRAIN_STEP_TREES, target - built)
+        built += step
+        model.set_params(n_estimators=built)
+        model.fit(X, y)
+        on_trees(step)
+    # predictions run single-threaded per estimator; don't carry the training n_jobs around
+    model.set_params(warm_start=False, n_jobs=None)
+    return model
+
+def _train_jobs_per_forest(n_forests):
+    """n_jobs for each of `n_forests` forests fitted concurrently, so together they use TRAIN_N_JOBS cores."""
+    if TRAIN_N_JOBS > 0:
+        total = TRAIN_N_JOBS
+    else:
+        try:
+            total = len(os.sched_getaffinity(0))
+        except AttributeError:
+            total = os.cpu_count() or 1
+    return max(1, total // n_forests)
+
+
+def train_model(random_state=42, progress=None, cancel_event=None):
+    """
+    Fits the role, company and package forests concurrently (sharing TRAIN_N_JOBS cores),
+    publishes them as a new model version and returns the artifact path.
+    `progress(fraction, message)` and `cancel_event` are the job_queue.JobQueue hooks.
+    """
     df = load_dataset()
-    _mlb = MultiLabelBinarizer(sparse_output=False)
-    skill_matrix = _mlb.fit_transform(df["_skill_list"])
-    skill_cols = [f"skill__{s}" for s in _mlb.classes_]
+    # same columns MultiLabelBinarizer.fit_transform over the skill lists would produce
+    order = np.argsort(np.asarray(_skill_names, dtype=str), kind="stable")
+    mlb = MultiLabelBinarizer(classes=[_skill_names[i] for i in order], sparse_output=False).fit([])
+    skill_matrix = _skill_matrix[:, order].toarray()
+    skill_cols = [f"skill__{s}" for s in mlb.classes_]
     branches = pd.get_dummies(df["Branch"].str.strip().str.upper(), prefix="branch")
     numeric = df[["CGPA", "Year"]].reset_index(drop=True)
     skill_df = pd.DataFrame(skill_matrix, columns=skill_cols)
@@ -60,60 +255,379 @@ def train_model(random_state=42):
     y_role = df["JobRole"].astype(str).reset_index(drop=True)
     y_company = df["Company"].astype(str).reset_index(drop=True)
     y_package = df["Package"].astype(float).reset_index(drop=True)
-    role_model = RandomForestClassifier(n_estimators=200, random_state=random_state)
-    company_model = RandomForestClassifier(n_estimators=200, random_state=random_state)
-    package_model = RandomForestRegressor(n_estimators=200, random_state=random_state)
-    role_model.fit(X, y_role)
-    company_model.fit(X, y_company)
-    package_model.fit(X, y_package)
-    _model_store = {"role": role_model, "company": company_model, "package": package_model}
-    _feature_columns = X.columns.tolist()
-    os.makedirs(MODEL_DIR, exist_ok=True)
-    joblib.dump({"models": _model_store, "mlb": _mlb, "feature_columns": _feature_columns}, MODEL_PATH)
-    return MODEL_PATH
-
-def load_model():
-    global _model_store, _mlb, _feature_columns
-    if _model_store is not None:
-        return
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError("Model not found. Train first.")
-    saved = joblib.load(MODEL_PATH)
-    _model_store = saved["models"]
-    _mlb = saved["mlb"]
-    _feature_columns = saved["feature_columns"]
-
-def _build_input_vector(branch: str, cgpa: float, skills_input: List[str], year: int):
-    load_model()
-    base = {c: 0 for c in _feature_columns}
-    branch_col = f"branch_{branch.strip().upper()}" if branch else None
-    if branch_col and branch_col in base:
-        base[branch_col] = 1
-    if "CGPA" in base:
-        base["CGPA"] = float(cgpa)
-    if "Year" in base:
-        base["Year"] = int(year) if year is not None else 0
-    skills_norm = [s.strip().lower() for s in skills_input if s and isinstance(s, str)]
-    try:
-        skills_vec = _mlb.transform([skills_norm])[0]
-    except Exception:
-        skills_vec = np.array([1 if s in skills_norm else 0 for s in _mlb.classes_])
-    for i, sname in enumerate(_mlb.classes_):
-        col = f"skill__{sname}"
-        if col in base:
-            base[col] = int(skills_vec[i])
-    return pd.DataFrame([base], columns=_feature_columns)
+    n_jobs = _train_jobs_per_forest(3)
+    role_model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=random_state, n_jobs=n_jobs)
+    company_model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=random_state, n_jobs=n_jobs)
+    package_model = RandomForestRegressor(n_estimators=N_ESTIMATORS, random_state=random_state, n_jobs=n_jobs)
+    models = {"role": role_model, "company": company_model, "package": package_model}
+    targets = {"role": y_role, "company": y_company, "package": y_package}
+
+    total_trees = N_ESTIMATORS * len(models)
+    done = [0]
+    done_lock = threading.Lock()
+
+    def on_trees(n):
+        with done_lock:
+            done[0] += n
+            if progress is not None:
+                # leave the last 5% for publishing the artifact
+                progress(0.95 * done[0] / total_trees, f"{done[0]}/{total_trees} trees")
+
+    with ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="fit") as pool:
+        futures = [pool.submit(_fit_forest, models[name], X, targets[name], on_trees, cancel_event) for name in models]
+        for f in futures:
+            f.result()
+
+    if progress is not None:
+        progress(0.95, "publishing model")
+    bundle = model_registry.publish(MODEL_DIR, models, mlb, X.columns.tolist(), use_compiled=INFERENCE_BACKEND == "compiled")
+    return os.path.join(bundle["dir"], model_registry.ARTIFACT_NAME)
+
+def load_model() -> Dict[str, Any]:
+    """
+    Returns the live model bundle (models, feature columns/index, compiled arrays). Callers
+    should keep the returned bundle for the whole request so a concurrent hot swap cannot mix
+    two model versions.
+    """
+    return model_registry.current_bundle(MODEL_DIR, MODEL_PATH, use_compiled=INFERENCE_BACKEND == "compiled")
+
+def _forest_predict(model, X: np.ndarray) -> np.ndarray:
+    """
+    Same result as model.predict(X) for our fitted forests, without sklearn's per-call
+    input validation. X must be a C-contiguous float32 array laid out as the bundle's feature_columns.
+    """
+    if hasattr(model, "classes_"):
+        proba = np.zeros((X.shape[0], len(model.classes_)), dtype=np.float64)
+        for est in model.estimators_:
+            proba += est.predict_proba(X, check_input=False)
+        proba /= len(model.estimators_)
+        return model.classes_.take(np.argmax(proba, axis=1), axis=0)
+    y = np.zeros(X.shape[0], dtype=np.float64)
+    for est in model.estimators_:
+        y += est.predict(X, check_input=False)
+    y /= len(model.estimators_)
+    return y
+
+def _predict_targets(bundle: Dict[str, Any], X: np.ndarray):
+    """Returns (roles, companies, packages) for a float32 feature batch using the configured backend."""
+    if bundle["compiled"] is not None and X.shape[0] <= COMPILED_MAX_BATCH:
+        preds = predict_compiled(bundle["compiled"], X)
+        return preds["role"], preds["company"], preds["package"]
+    models = model_registry.bundle_models(bundle)
+    return (_forest_predict(models["role"], X),
+            _forest_predict(models["company"], X),
+            _forest_predict(models["package"], X))
+
+def _build_input_vector(bundle: Dict[str, Any], branch: str, cgpa: float, skills_input: List[str], year: int) -> np.ndarray:
+    """Fills this thread's preallocated (1, n_features) float32 row at the active branch/skill positions."""
+    feature_index = bundle["feature_index"]
+    n_features = len(bundle["feature_columns"])
+    row = getattr(_row_local, "row", None)
+    if row is None or row.shape[1] != n_features:
+        row = np.zeros((1, n_features), dtype=np.float32)
+        _row_local.row = row
+    else:
+        row.fill(0)
+    if branch:
+        idx = feature_index.get(f"branch_{branch.strip().upper()}")
+        if idx is not None:
+            row[0, idx] = 1
+    if "CGPA" in feature_index:
+        row[0, feature_index["CGPA"]] = float(cgpa)
+    if "Year" in feature_index:
+        row[0, feature_index["Year"]] = int(year) if year is not None else 0
+    for s in skills_input:
+        if s and isinstance(s, str):
+            idx = feature_index.get(f"skill__{s.strip().lower()}")
+            if idx is not None:
+                row[0, idx] = 1
+    return row
 
 def predict_opportunity(branch: str, cgpa: float, skills: List[str], year: int = None) -> Dict[str, Any]:
-    load_model()
-    Xrow = _build_input_vector(branch, cgpa, skills, year or 0)
-    role_pred = _model_store["role"].predict(Xrow)[0]
-    company_pred = _model_store["company"].predict(Xrow)[0]
-    package_pred = float(_model_store["package"].predict(Xrow)[0])
+    bundle = load_model()
+    Xrow = _build_input_vector(bundle, branch, cgpa, skills, year or 0)
+    roles, companies, packages = _predict_targets(bundle, Xrow)
+    role_pred = roles[0]
+    company_pred = companies[0]
+    package_pred = float(packages[0])
     return {"company": company_pred, "role": role_pred, "package": round(package_pred, 2)}
 
+# ---------------- batch prediction ----------------
+BATCH_CHUNK_SIZE = 1000
+_BATCH_ID_FIELDS = ("studentname", "rollnumber", "id")
+
+def _skills_from_value(v) -> List[str]:
+    if isinstance(v, str):
+        return _normalize_skill_string(v)
+    if isinstance(v, (list, tuple)):
+        return [s.strip().lower() for s in v if s and isinstance(s, str)]
+    return []
+
+def _empty_value(v) -> bool:
+    if isinstance(v, (list, tuple)):
+        return not v
+    return v is None or (isinstance(v, str) and not v.strip()) or (np.isscalar(v) and pd.isna(v))
+
+def _normalize_keys(student: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Strips and lowercases the keys of one student dict. When several keys collapse to the same
+    name ("branch" and "Branch"), the first non-empty value in the dict's key order wins.
+    """
+    out: Dict[str, Any] = {}
+    for k, v in student.items():
+        key = str(k).strip().lower()
+        if key not in out or (_empty_value(out[key]) and not _empty_value(v)):
+            out[key] = v
+    return out
+
+def _build_input_matrix(bundle: Dict[str, Any], students: List[Dict[str, Any]]) -> np.ndarray:
+    """Vectorized counterpart of _build_input_vector: one float32 feature row per student dict."""
+    frame = pd.DataFrame([_normalize_keys(st) for st in students])
+    n = len(frame)
+    col_index = bundle["feature_index"]
+    X = np.zeros((n, len(bundle["feature_columns"])), dtype=np.float32)
+    if n == 0:
+        return X
+
+    if "branch" in frame:
+        branch_cols = ("branch_" + frame["branch"].fillna("").astype(str).str.strip().str.upper()).map(col_index)
+        hit = branch_cols.notna().to_numpy()
+        X[np.flatnonzero(hit), branch_cols[hit].astype(int).to_numpy()] = 1
+    if "CGPA" in col_index and "cgpa" in frame:
+        X[:, col_index["CGPA"]] = pd.to_numeric(frame["cgpa"], errors="coerce").fillna(0.0).to_numpy()
+    if "Year" in col_index and "year" in frame:
+        X[:, col_index["Year"]] = pd.to_numeric(frame["year"], errors="coerce").fillna(0).astype(int).to_numpy()
+    if "skills" in frame:
+        exploded = frame["skills"].map(_skills_from_value).explode().dropna()
+        skill_cols = ("skill__" + exploded.astype(str)).map(col_index)
+        hit = skill_cols.notna().to_numpy()
+        X[exploded.index.to_numpy()[hit], skill_cols[hit].astype(int).to_numpy()] = 1
+    return X
+
+def _predict_chunk(bundle: Dict[str, Any], students: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    X = _build_input_matrix(bundle, students)
+    roles, companies, packages = _predict_targets(bundle, X)
+    results = []
+    for i, st in enumerate(students):
+        res = {"row": offset + i}
+        for k, v in st.items():
+            if str(k).strip().lower() in _BATCH_ID_FIELDS and not pd.isna(v):
+                res[k] = v.item() if isinstance(v, np.generic) else v
+        res["prediction"] = {"company": str(companies[i]), "role": str(roles[i]), "package": round(float(packages[i]), 2)}
+        results.append(res)
+    return results
+
+def predict_opportunity_batch(students: Iterable[Dict[str, Any]], chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Predicts company/role/package for a stream of student dicts (keys: branch, cgpa, skills, year;
+    case-insensitive). Students are consumed `chunk_size` at a time and each chunk calls predict
+    once per model, so memory stays bounded for large cohorts. Yields one result dict per student;
+    a chunk that fails yields one {"status": "error", "rows": [first, last]} dict instead and the
+    stream carries on with the next chunk.
+    """
+    # one bundle for the whole stream, so a hot swap mid-export cannot mix model versions
+    bundle = load_model()
+    it = iter(students)
+    offset = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        try:
+            results = _predict_chunk(bundle, chunk, offset)
+        except Exception as e:
+            results = [{"status": "error", "rows": [offset, offset + len(chunk) - 1], "message": str(e)}]
+        yield from results
+        offset += len(chunk)
+
+def iter_students_csv(file_stream, chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Lazily reads a cohort CSV (Branch, CGPA, Skills, Year, ...) as student dicts."""
+    for frame in pd.read_csv(file_stream, chunksize=chunk_size):
+        frame.columns = [str(c).strip() for c in frame.columns]
+        yield from frame.to_dict(orient="records")
+
+# ---------------- dataset query / export ----------------
+EXPORT_COLUMNS = ("StudentName", "RollNumber", "Branch", "CGPA", "Skills", "Company",
+                  "JobRole", "Package", "Year", "OpportunityType")
+
+def _records_for_rows(rows: np.ndarray) -> List[Dict[str, Any]]:
+    cols = {c: _column_values(c, rows) for c in EXPORT_COLUMNS}
+    out = []
+    for j in range(len(rows)):
+        roll, year = cols["RollNumber"][j], cols["Year"][j]
+        out.append({
+            "StudentName": cols["StudentName"][j],
+            "RollNumber": int(roll) if not pd.isna(roll) else None,
+            "Branch": cols["Branch"][j],
+            "CGPA": float(cols["CGPA"][j]),
+            "Skills": cols["Skills"][j],
+            "Company": cols["Company"][j],
+            "JobRole": cols["JobRole"][j],
+            "Package": float(cols["Package"][j]),
+            "Year": int(year) if not pd.isna(year) else None,
+            "OpportunityType": cols["OpportunityType"][j],
+        })
+    return out
+
+def query_dataset(filters: Dict[str, List[Any]] = None, cgpa_min: float = None, cgpa_max: float = None) -> np.ndarray:
+    """
+    Sorted row ids of the placement history matching `filters` (column -> accepted values,
+    any of; columns from EXPORT_EQUALS_COLUMNS) and the inclusive CGPA range.
+    """
+    load_dataset()
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    unknown = set(filters) - set(EXPORT_EQUALS_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot filter on: {sorted(unknown)}")
+    return dataset_index.select_rows(_column_indexes, filters, {"CGPA": (cgpa_min, cgpa_max)})
+
+def iter_dataset_records(rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Yields the records of `rows` in chunks of at most `chunk_size`, materializing one chunk at a time."""
+    load_dataset()
+    for start in range(0, len(rows), chunk_size):
+        yield _records_for_rows(rows[start:start + chunk_size])
+
+# ---------------- similar students ----------------
+def _query_skill_ids(query: set) -> List[int]:
+    """Vocabulary ids for the query; unknown skills get ids past the vocabulary so they still count in the union."""
+    n = len(_skill_names)
+    unknown = sorted(s for s in query if s not in _skill_vocab)
+    return [_skill_vocab[s] for s in query if s in _skill_vocab] + [n + i for i in range(len(unknown))]
+
+def _jaccard(rows: np.ndarray, query_ids: List[int], n_query: int) -> np.ndarray:
+    """Exact Jaccard similarity between the query set and the skill sets of `rows`."""
+    known = [i for i in query_ids if i < len(_skill_names)]
+    sub = _skill_matrix[rows]
+    if known:
+        q = np.zeros(len(_skill_names), dtype=np.int32)
+        q[known] = 1
+        inter = np.asarray(sub @ q).ravel().astype(np.float64)
+    else:
+        inter = np.zeros(len(rows))
+    sizes = np.diff(sub.indptr).astype(np.float64)
+    union = sizes + n_query - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+def similar_students(skills_input: List[str], top_k: int = 10, exact: bool = False) -> Dict[str, Any]:
+    """
+    Top-k past students by Jaccard similarity of skill sets (ties go to the earlier row).
+    The default approximate mode ranks only the MinHash/LSH candidates; exact=True scores
+    every row.
+    """
+    load_dataset()
+    query = {s.strip().lower() for s in skills_input if s and isinstance(s, str) and s.strip()}
+    query_ids = _query_skill_ids(query)
+    if exact:
+        rows = np.arange(_skill_matrix.shape[0])
+    else:
+        rows = _similar_index.candidates(query_ids)
+    n_candidates = len(rows)
+    jac = _jaccard(rows, query_ids, len(query)) if len(rows) else np.zeros(0)
+    keep = jac > 0
+    rows, jac = rows[keep], jac[keep]
+    if top_k < len(rows):
+        cut = np.partition(-jac, top_k - 1)[top_k - 1]
+        keep = -jac <= cut
+        rows, jac = rows[keep], jac[keep]
+    order = np.lexsort((rows, -jac))[:top_k]
+    students = _records_for_rows(rows[order])
+    for rec, j in zip(students, jac[order]):
+        rec["jaccard"] = round(float(j), 4)
+    return {"mode": "exact" if exact else "approximate", "candidates": int(n_candidates), "students": students}
+
 # ---------------- recommend-from-trends (UPDATED) ----------------
-def recommend_from_trends(skills_input: List[str], branch: str = None, cgpa: float = None, year: int = None, top_k: int = 10):
+def _query_fingerprint(query: set, branch: str, cgpa: float) -> str:
+    key = json.dumps([_dataset_version, sorted(query), str(branch or "").strip().lower(), cgpa])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def _encode_cursor(fp: str, offset: int, window: Dict[str, np.ndarray], i: int) -> str:
+    """Opaque cursor: query fingerprint, absolute offset and the ranking key of the last row returned."""
+    payload = {"q": fp, "o": offset, "s": float(window["score"][i]), "ov": int(window["overlap"][i]),
+               "b": int(window["branch_match"][i]), "r": int(window["rows"][i])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str, fp: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get("q") != fp:
+        raise ValueError("Cursor does not belong to this query or the dataset has changed")
+    return payload
+
+def _rank_window(matched_idx: np.ndarray, query_ids: List[int], n_query: int, branch: str, cgpa: float,
+                 after: Dict[str, Any] = None, limit: int = 10) -> Dict[str, np.ndarray]:
+    """
+    Scores the matched rows and returns the next `limit` of them in ranking order
+    (score, overlap, branch match descending; dataset order on ties), starting after `after`.
+    """
+    df = _df_cache
+    q = np.zeros(_skill_matrix.shape[1], dtype=np.int32)
+    q[query_ids] = 1
+    overlap = _skill_matrix[matched_idx] @ q
+    if branch:
+        branch_match = (_branch_norm[matched_idx] == str(branch).strip().lower()).astype(np.int64)
+    else:
+        branch_match = np.zeros(len(matched_idx), dtype=np.int64)
+    if cgpa is not None:
+        cgpa_diff = np.abs(df["CGPA"].to_numpy(dtype=float)[matched_idx] - float(cgpa))
+    else:
+        cgpa_diff = np.zeros(len(matched_idx))
+    score = overlap * 10 + branch_match * 2 - cgpa_diff * 0.5
+
+    cand = np.arange(len(matched_idx))
+    if after is not None:
+        s, ov, b, r = after["s"], after["ov"], after["b"], after["r"]
+        keep = (score < s) | ((score == s) & ((overlap < ov) | ((overlap == ov) & ((branch_match < b) | ((branch_match == b) & (matched_idx > r))))))
+        cand = cand[keep]
+    if len(cand) > limit:
+        # partial selection: only rows scoring at least the limit-th best score get fully ordered
+        kth = np.partition(score[cand], len(cand) - limit)[len(cand) - limit]
+        cand = cand[score[cand] >= kth]
+    order = np.lexsort((matched_idx[cand], -branch_match[cand], -overlap[cand], -score[cand]))
+    cand = cand[order[:limit]]
+    return {"rows": matched_idx[cand], "overlap": overlap[cand], "branch_match": branch_match[cand],
+            "score": score[cand], "sim": overlap[cand] / max(n_query, 1)}
+
+def _records_for_window(window: Dict[str, np.ndarray], lo: int, hi: int) -> List[Dict[str, Any]]:
+    out = _records_for_rows(window["rows"][lo:hi])
+    for j, rec in enumerate(out):
+        rec["overlap"] = int(window["overlap"][lo + j])
+        rec["similarity"] = float(window["sim"][lo + j])
+        rec["score"] = float(window["score"][lo + j])
+    return out
+
+def _model_version():
+    try:
+        return load_model()["version"]
+    except Exception:
+        return None
+
+def recommend_cache_stats() -> Dict[str, Any]:
+    return _result_cache.stats()
+
+def recommend_from_trends(skills_input: List[str], branch: str = None, cgpa: float = None, year: int = None, top_k: int = 10,
+                          cursor: str = None):
+    """
+    Cached front of _recommend_from_trends. The key is the normalized skill set, branch, CGPA
+    bucket, year, top_k and cursor plus the dataset and model versions, so reloading either one
+    makes older entries unreachable.
+    """
+    load_dataset()
+    if cgpa is not None and CGPA_BUCKET > 0:
+        cgpa = round(round(float(cgpa) / CGPA_BUCKET) * CGPA_BUCKET, 6)
+    query = sorted({s.strip().lower() for s in skills_input if s and isinstance(s, str)})
+    key = json.dumps([query, str(branch or "").strip().lower(), cgpa, str(year or ""), top_k, cursor or "",
+                      _dataset_version, _model_version()])
+    key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    res = _result_cache.get(key)
+    if res is None:
+        res = _recommend_from_trends(skills_input, branch, cgpa, year, top_k, cursor)
+        _result_cache.set(key, res)
+    return res
+
+def _recommend_from_trends(skills_input: List[str], branch: str = None, cgpa: float = None, year: int = None, top_k: int = 10,
+                           cursor: str = None):
     """
     Returns:
       {
@@ -121,66 +635,64 @@ def recommend_from_trends(skills_input: List[str], branch: str = None, cgpa: flo
         "stats": {...},
         "predicted": {...} or None,
         "roles_for_skills": [...],
-        "companies_for_skills": [...]
+        "companies_for_skills": [...],
+        "next_cursor": str or None   # pass back as `cursor` for the next top_k students
       }
     """
     df = load_dataset()
     s_norm = [s.strip().lower() for s in skills_input if s and isinstance(s, str)]
     if len(s_norm) == 0:
-        return {"matched_students": [], "stats": {}, "predicted": None, "roles_for_skills": [], "companies_for_skills": []}
+        return {"matched_students": [], "stats": {}, "predicted": None, "roles_for_skills": [], "companies_for_skills": [], "next_cursor": None}
 
-    # Collect roles & companies where any of the input skills appear
+    query = set(s_norm)
+    query_ids = [_skill_vocab[s] for s in query if s in _skill_vocab]
+
+    # roles & companies where any of the input skills appear, straight from the inverted index
     roles_set = set()
     companies_set = set()
-    for _, r in df.iterrows():
-        student_skills = set(r["_skill_list"])
-        if any(skill in student_skills for skill in s_norm):
-            roles_set.add(str(r["JobRole"]))
-            companies_set.add(str(r["Company"]))
-
-    # compute matching metrics (overlap, similarity, branch match, cgpa diff, score)
-    def compute_metrics(row):
-        row_sk = set(row["_skill_list"])
-        overlap = len(set(s_norm) & row_sk)
-        sim = overlap / max(len(set(s_norm)), 1)
-        branch_match = 1 if branch and (str(row["Branch"]).strip().lower() == str(branch).strip().lower()) else 0
-        cgpa_diff = abs(float(row["CGPA"]) - float(cgpa)) if cgpa is not None else 0
-        score = overlap * 10 + branch_match * 2 - cgpa_diff * 0.5
-        return pd.Series({"_overlap": overlap, "_sim": sim, "_branch_match": branch_match, "_cgpa_diff": cgpa_diff, "_score": score})
-
-    metrics = df.apply(compute_metrics, axis=1)
-    df2 = pd.concat([df, metrics], axis=1)
-    matched = df2[df2["_overlap"] > 0].copy()
-    total_students = len(df2)
-    matched_count = len(matched)
+    for s in query:
+        entry = _skill_index.get(s)
+        if entry:
+            roles_set.update(entry["roles"])
+            companies_set.update(entry["companies"])
+
+    # matched rows = union of the query skills' posting lists; only these get scored
+    matched_idx = rows_with_any_skill(list(query))
+    matched_count = len(matched_idx)
     if matched_count == 0:
         stats = {"matched_count": 0, "matched_pct": 0.0, "avg_package": 0.0, "top_companies": {}, "top_roles": {}}
-        return {"matched_students": [], "stats": stats, "predicted": None, "roles_for_skills": list(roles_set), "companies_for_skills": list(companies_set)}
-
-    matched = matched.sort_values(by=["_score", "_overlap", "_branch_match"], ascending=[False, False, False])
-    top = matched.head(top_k)
-    matched_students = []
-    for _, r in top.iterrows():
-        matched_students.append({
-            "StudentName": r["StudentName"],
-            "RollNumber": int(r["RollNumber"]) if not pd.isna(r["RollNumber"]) else None,
-            "Branch": r["Branch"],
-            "CGPA": float(r["CGPA"]),
-            "Skills": r["Skills"],
-            "Company": r["Company"],
-            "JobRole": r["JobRole"],
-            "Package": float(r["Package"]),
-            "Year": int(r["Year"]) if not pd.isna(r["Year"]) else None,
-            "OpportunityType": r["OpportunityType"],
-            "overlap": int(r["_overlap"]),
-            "similarity": float(r["_sim"]),
-            "score": float(r["_score"])
-        })
+        return {"matched_students": [], "stats": stats, "predicted": None, "roles_for_skills": list(roles_set), "companies_for_skills": list(companies_set), "next_cursor": None}
+
+    fp = _query_fingerprint(query, branch, cgpa)
+    after = _decode_cursor(cursor, fp) if cursor else None
+    offset = after["o"] if after else 0
+    with _rank_lock:
+        cached = _rank_cache.get(fp)
+        if cached is not None:
+            _rank_cache.move_to_end(fp)
+    if cached is not None and cached["start"] <= offset and (offset + top_k <= cached["start"] + len(cached["window"]["rows"]) or cached["complete"]):
+        window, start = cached["window"], cached["start"]
+    else:
+        limit = max(top_k, 1) * RANK_PREFETCH_PAGES
+        window, start = _rank_window(matched_idx, query_ids, len(query), branch, cgpa, after=after, limit=limit), offset
+        with _rank_lock:
+            _rank_cache[fp] = {"window": window, "start": start, "complete": start + len(window["rows"]) >= matched_count}
+            _rank_cache.move_to_end(fp)
+            while len(_rank_cache) > RANK_CACHE_SIZE:
+                _rank_cache.popitem(last=False)
+
+    lo = offset - start
+    hi = min(lo + top_k, len(window["rows"]))
+    matched_students = _records_for_window(window, lo, hi)
+    next_cursor = None
+    if hi > lo and offset + (hi - lo) < matched_count:
+        next_cursor = _encode_cursor(fp, offset + (hi - lo), window, hi - 1)
 
-    avg_package = float(matched["Package"].mean())
-    top_companies = matched.groupby("Company")["StudentName"].count().sort_values(ascending=False).head(5).to_dict()
-    top_roles = matched.groupby("JobRole")["StudentName"].count().sort_values(ascending=False).head(5).to_dict()
-    stats = {"matched_count": matched_count, "matched_pct": round(matched_count / max(total_students, 1) * 100, 2), "avg_package": round(avg_package, 2), "top_companies": top_companies, "top_roles": top_roles}
+    # one- and two-skill queries read the pre-aggregated cube; larger ones aggregate the matched rows
+    stats = stats_cube.stats_for_skills(_stats_cube, query_ids)
+    if stats is None:
+        stats = stats_cube.stats_for_rows(_stats_cube, matched_idx, df["Company"].cat.codes.to_numpy(),
+                                          df["JobRole"].cat.codes.to_numpy(), df["Package"].to_numpy(dtype=float))
 
     predicted = None
     try:
@@ -189,4 +701,4 @@ def recommend_from_trends(skills_input: List[str], branch: str = None, cgpa: flo
     except Exception:
         predicted = None
 
-    return {"matched_students": matched_students, "stats": stats, "predicted": predicted, "roles_for_skills": sorted(roles_set), "companies_for_skills": sorted(companies_set)}
+    return {"matched_students": matched_students, "stats": stats, "predicted": predicted, "roles_for_skills": sorted(roles_set), "companies_for_skills": sorted(companies_set), "next_cursor": next_cursor}
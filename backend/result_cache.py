@@ -0,0 +1,206 @@
+# backend/result_cache.py
+"""
+Bounded result caches with size- and TTL-based eviction and hit/miss counters.
+
+LocalCache lives in the worker process. RedisCache is shared across workers and is only used
+when configured (RESULT_CACHE_BACKEND=redis); the redis package is imported lazily so it stays
+an optional dependency. DiskCache keeps one JSON file per entry in a directory, survives
+restarts and can be shared by processes on one host. Values stored in RedisCache and DiskCache
+must be JSON-serializable.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class LocalCache:
+    def __init__(self, max_size: int = 1024, ttl_sec: float = 300.0):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"backend": "local", "size": len(self._data), "max_size": self.max_size, "ttl_sec": self.ttl_sec,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+
+class RedisCache:
+    """Shared cache; Redis' own maxmemory/LRU policy bounds its size, entries expire after ttl_sec."""
+
+    def __init__(self, url: str, prefix: str, ttl_sec: float = 300.0):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESULT_CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self.prefix + key)
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        self._client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl_sec)))
+
+    def clear(self):
+        for k in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(k)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"backend": "redis", "prefix": self.prefix, "ttl_sec": self.ttl_sec,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+
+class DiskCache:
+    """
+    LRU cache of JSON files bounded by entry count and total bytes. Entries are namespaced by
+    `version`; files written under another version are never read, but they are not deleted
+    either (workers of an old and a new release share the directory during a rolling deploy).
+    They count against the bounds and, since nothing refreshes them, age out first.
+    Recency is the file mtime, refreshed on every hit, so processes sharing the directory see a
+    common LRU order once they rescan it on startup.
+    """
+
+    def __init__(self, directory: str, version: str, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._index = OrderedDict()  # file name -> size in bytes, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _name(self, key: str) -> str:
+        return f"{self.version}-{key}.json"
+
+    def _scan(self):
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(found):
+            self._index[name] = size
+            self._bytes += size
+        self._evict_locked()
+
+    def _evict_locked(self):
+        while self._index and (len(self._index) > self.max_entries or self._bytes > self.max_bytes):
+            name, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Any]:
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                value = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+                if name in self._index:
+                    self._bytes -= self._index.pop(name)
+            return None
+        with self._lock:
+            self.hits += 1
+            if name not in self._index:
+                # written by another process since our scan
+                self._index[name] = os.path.getsize(path)
+                self._bytes += self._index[name]
+            self._index.move_to_end(name)
+        return value
+
+    def set(self, key: str, value: Any):
+        data = json.dumps(value).encode("utf-8")
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self._evict_locked()
+
+    def clear(self):
+        """Removes this version's entries; other versions' files are left to their own processes."""
+        prefix = self.version + "-"
+        with self._lock:
+            for name in [n for n in self._index if n.startswith(prefix)]:
+                self._bytes -= self._index.pop(name)
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"backend": "disk", "version": self.version, "size": len(self._index), "bytes": self._bytes,
+                    "max_size": self.max_entries, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+
+def make_cache(name: str, max_size: int, ttl_sec: float):
+    """Builds the cache selected by RESULT_CACHE_BACKEND ("local" by default, or "redis" with REDIS_URL)."""
+    if os.getenv("RESULT_CACHE_BACKEND", "local").strip().lower() == "redis":
+        return RedisCache(os.getenv("REDIS_URL", "redis://localhost:6379/0"), prefix=f"placeme:{name}:", ttl_sec=ttl_sec)
+    return LocalCache(max_size=max_size, ttl_sec=ttl_sec)
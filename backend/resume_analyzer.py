@@ -1,135 +1,300 @@
 # backend/resume_analyzer.py
 import fitz  # PyMuPDF
+import hashlib
+import os
 import re
+import shutil
+import tempfile
+from array import array
 from fpdf import FPDF
-import pandas as pd
-
-def extract_text_and_styles(file_stream):
-    doc = fitz.open(stream=file_stream.read(), filetype="pdf")
-    text = ""
-    fonts = []
-    font_issues = []
-    words = []
-
-    for page in doc:
-        blocks = page.get_text("dict")["blocks"]
-        for b in blocks:
-            if "lines" in b:
-                for l in b["lines"]:
+import resume_rules
+import numpy as np
+
+# extraction limits; larger uploads are rejected, pages past the limit are not read
+MAX_PDF_BYTES = int(os.getenv("RESUME_MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("RESUME_MAX_PDF_PAGES", "20"))
+# fingerprint of the extraction and rule-engine code; cached analyses from another version are ignored
+# (rule pack contents are part of each cache key, see analysis_cache_key)
+_h = hashlib.sha1(f"pages={MAX_PDF_PAGES}".encode())
+for _path in (__file__, resume_rules.__file__):
+    with open(_path, "rb") as _fh:
+        _h.update(_fh.read())
+RULES_VERSION = _h.hexdigest()[:12]
+
+# the default "dict" flags without TEXT_PRESERVE_IMAGES, so image blocks carry no pixel data
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+class SpanTable:
+    """
+    Non-empty text spans of a PDF as parallel columns: `texts` (stripped strings), `size`
+    (float64), `font` (int32 ids into `fonts`, interned in first-seen order) and `flags` (int32).
+    """
+    __slots__ = ("texts", "size", "font", "flags", "fonts", "pages", "truncated")
+
+    def __init__(self, texts, size, font, flags, fonts, pages, truncated):
+        self.texts = texts
+        self.size = size
+        self.font = font
+        self.flags = flags
+        self.fonts = fonts
+        self.pages = pages
+        self.truncated = truncated
+
+    def __len__(self):
+        return len(self.texts)
+
+
+def read_pdf_bytes(file_stream, max_bytes: int = None) -> bytes:
+    """Reads the upload, refusing it as soon as it is known to exceed max_bytes."""
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
+    try:
+        pos = file_stream.tell()
+        file_stream.seek(0, os.SEEK_END)
+        size = file_stream.tell() - pos
+        file_stream.seek(pos)
+    except (AttributeError, OSError, ValueError):
+        size = None
+    if size is not None and size > max_bytes:
+        raise ValueError(f"PDF is larger than the {max_bytes / (1024 * 1024):.1f} MB limit")
+    data = file_stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"PDF is larger than the {max_bytes / (1024 * 1024):.1f} MB limit")
+    return data
+
+
+def extract_text_and_styles(file_stream, max_pages: int = None, max_bytes: int = None):
+    """
+    Returns (text, fonts, spans): the span texts joined by single spaces, the distinct font names
+    and a SpanTable. Pages are decoded one at a time and at most `max_pages` are read.
+    """
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
+    texts = []
+    size = array("d")
+    font = array("i")
+    flags = array("i")
+    font_ids = {}
+
+    doc = fitz.open(stream=read_pdf_bytes(file_stream, max_bytes), filetype="pdf")
+    try:
+        n_pages = min(doc.page_count, max_pages)
+        for pno in range(n_pages):
+            page = doc.load_page(pno)
+            for b in page.get_text("dict", flags=_TEXT_FLAGS)["blocks"]:
+                for l in b.get("lines", ()):
                     for s in l["spans"]:
                         content = s["text"].strip()
                         if content:
-                            text += content + " "
-                            fonts.append(s["font"])
-                            words.append({
-                                "text": content,
-                                "size": s["size"],
-                                "font": s["font"],
-                                "flags": s["flags"]
-                            })
-    doc.close()
-    return text.strip(), list(set(fonts)), words
-
-def analyze_resume(file_stream):
-    text, font_styles, word_info = extract_text_and_styles(file_stream)
-
-    score = 100
-    summary = f"The resume contains {len(text.split())} words."
-    suggestions = []
-    good_points = []
-
-    # SECTION CHECKS
-    required_sections = ["education", "experience", "skills", "projects"]
-    present_sections = [s for s in required_sections if s in text.lower()]
-
-    for section in present_sections:
-        good_points.append(f"{section.capitalize()} section is included.")
-
-    missing_sections = [s for s in required_sections if s not in present_sections]
-    for ms in missing_sections:
-        suggestions.append(f"Missing important section: {ms.capitalize()}.")
-
-    # FONT SUGGESTIONS
-    font_names = set([w['font'] for w in word_info])
-    if len(font_names) > 2:
-        suggestions.append("Too many font styles used. Use a consistent font (1–2 max).")
-        score -= 5
-
-    # FONT SIZE VALIDATION
-    for w in word_info:
-        if w['size'] < 9:
-            suggestions.append(f"Text '{w['text']}' font size too small. Use at least 10pt.")
-            score -= 1
-        elif w['size'] > 15:
-            suggestions.append(f"Text '{w['text']}' font size too large. Keep headings below 15pt.")
-            score -= 1
-
-    # CAPITALIZATION
-    for word in word_info:
-        if word['text'].isupper() and len(word['text']) > 5:
-            suggestions.append(f"Text '{word['text']}' is all uppercase — avoid excessive capitalization.")
-
-    # CONTENT LENGTH
-    if len(text.split()) < 250:
-        suggestions.append("Resume seems short — consider adding more content.")
-        score -= 5
-
-    # GOOD POINTS
-    if "project" in text.lower():
-        good_points.append("Includes project section.")
-    if "internship" in text.lower() or "experience" in text.lower():
-        good_points.append("Work experience is listed.")
-    if "summary" in text.lower() or "objective" in text.lower():
-        good_points.append("Professional summary included.")
-
-    details = [
-        f"Font styles used: {', '.join(font_names)}",
-        f"Sections found: {', '.join(present_sections)}"
-    ]
-
-    # Deduplicate suggestions
-    suggestions = list(set(suggestions))
-
-    return {
-        "score": max(score, 0),
-        "summary": summary,
-        "details": details,
-        "good_points": good_points,
-        "suggestions": suggestions
-    }
+                            texts.append(content)
+                            size.append(s["size"])
+                            font.append(font_ids.setdefault(s["font"], len(font_ids)))
+                            flags.append(s["flags"])
+            page = None  # drop the page's display list before decoding the next one
+        truncated = doc.page_count > n_pages
+    finally:
+        doc.close()
 
-def export_analysis_to_pdf(data):
-    pdf = FPDF()
+    spans = SpanTable(texts, np.frombuffer(size, dtype=np.float64), np.frombuffer(font, dtype=np.int32),
+                      np.frombuffer(flags, dtype=np.int32), list(font_ids), n_pages, truncated)
+    return " ".join(texts), spans.fonts, spans
+
+def analyze_resume(file_stream, rule_pack: str = None):
+    """Scores a resume PDF with the named rule pack (see resume_rules; "default" when omitted)."""
+    rules = resume_rules.get_rules(rule_pack)
+    text, _, spans = extract_text_and_styles(file_stream)
+    return rules.evaluate(text, spans)
+
+def analysis_cache_key(data: bytes, rule_pack: str = None) -> str:
+    """Cache key of one analysis: the PDF content hash plus the rule pack's name and content hash."""
+    rules = resume_rules.get_rules(rule_pack)
+    return f"{hashlib.sha256(data).hexdigest()}-{rules.name}-{rules.fingerprint}"
+
+# cohort exports render this many analyses per FPDF document before merging them into the output
+EXPORT_PDF_BATCH = int(os.getenv("RESUME_EXPORT_PDF_BATCH", "50"))
+# the per-file sheet layout keeps one open temp file per sheet, so larger cohorts use row blocks
+EXPORT_MAX_SHEETS = int(os.getenv("RESUME_EXPORT_MAX_SHEETS", "100"))
+
+# FPDF core fonts are latin-1 only; map the typographic characters rule packs use
+_LATIN1 = str.maketrans({"\u2014": "-", "\u2013": "-", "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+                         "\u2022": "-", "\u2026": "..."})
+
+
+def _latin1(text):
+    return str(text).translate(_LATIN1).encode("latin-1", "replace").decode("latin-1")
+
+
+def _pdf_write_analysis(pdf, data, title="Resume Analysis Report"):
     pdf.add_page()
     pdf.set_font("Arial", size=12)
 
-    pdf.cell(0, 10, "Resume Analysis Report", ln=True, align="C")
+    pdf.cell(0, 10, _latin1(title), ln=True, align="C")
     pdf.ln(10)
     pdf.cell(0, 10, f"Score: {data['score']}/100", ln=True)
-    pdf.multi_cell(0, 10, f"Summary: {data['summary']}")
+    pdf.multi_cell(0, 10, _latin1(f"Summary: {data['summary']}"))
     pdf.ln(5)
 
     pdf.set_font("Arial", style='B', size=12)
     pdf.cell(0, 10, "Good Points", ln=True)
     pdf.set_font("Arial", size=12)
     for point in data['good_points']:
-        pdf.cell(0, 10, f"- {point}", ln=True)
+        pdf.cell(0, 10, _latin1(f"- {point}"), ln=True)
 
     pdf.ln(5)
     pdf.set_font("Arial", style='B', size=12)
     pdf.cell(0, 10, "Suggestions", ln=True)
     pdf.set_font("Arial", size=12)
     for s in data['suggestions']:
-        pdf.multi_cell(0, 10, f"- {s}")
+        pdf.multi_cell(0, 10, _latin1(f"- {s}"))
+
 
+def export_analysis_to_pdf(data):
+    pdf = FPDF()
+    _pdf_write_analysis(pdf, data)
     return pdf.output(dest='S').encode('latin-1')
 
+
+def _excel_rows(data):
+    good, sugg = data['good_points'], data['suggestions']
+    for i in range(max(len(good), len(sugg), 1)):
+        yield [good[i] if i < len(good) else '', sugg[i] if i < len(sugg) else '']
+
+
 def export_analysis_to_excel(data):
-    df = pd.DataFrame({
-        "Good Points": data['good_points'] + [''] * (max(len(data['suggestions']), 1) - len(data['good_points'])),
-        "Suggestions": data['suggestions'] + [''] * (max(len(data['good_points']), 1) - len(data['suggestions']))
-    })
     from io import BytesIO
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(["Good Points", "Suggestions"])
+    for row in _excel_rows(data):
+        ws.append(row)
     output = BytesIO()
-    df.to_excel(output, index=False)
+    wb.save(output)
     return output.getvalue()
+
+_SHEET_NAME_BAD = re.compile(r"[\[\]:*?/\\]")
+
+def _sheet_name(name, used):
+    """Excel sheet names: at most 31 characters, no []:*?/\\ and unique within the workbook."""
+    base = _SHEET_NAME_BAD.sub("_", os.path.splitext(os.path.basename(name))[0]).strip("'") or "resume"
+    candidate, n = base[:31], 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        candidate = base[:31 - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+def write_analyses_xlsx(results, fileobj, layout="rows"):
+    """
+    Cohort workbook written in openpyxl's write-only mode, so rows go to disk as they are
+    produced. `results` is an iterable of (file name, analysis or None) pairs, consumed once;
+    None marks a file that could not be analyzed. Sheets:
+      Overview   one row per file: File, Score, Summary
+      Analyses   layout="rows": a block of rows per file (File, Score, Good Points, Suggestions)
+      <file>     layout="sheets": one sheet per file in the export_analysis_to_excel layout
+    """
+    from openpyxl import Workbook
+    if layout not in ("rows", "sheets"):
+        raise ValueError("layout must be 'rows' or 'sheets'")
+    wb = Workbook(write_only=True)
+    overview = wb.create_sheet("Overview")
+    overview.append(["File", "Score", "Summary"])
+    if layout == "rows":
+        blocks = wb.create_sheet("Analyses")
+        blocks.append(["File", "Score", "Good Points", "Suggestions"])
+    used = {"overview", "analyses"}
+    for name, data in results:
+        overview.append([name, data["score"] if data else None, data["summary"] if data else "Not analyzed"])
+        if not data:
+            continue
+        if layout == "rows":
+            for i, row in enumerate(_excel_rows(data)):
+                blocks.append(([name, data["score"]] if i == 0 else ['', None]) + row)
+        else:
+            ws = wb.create_sheet(_sheet_name(name, used))
+            ws.append(["Good Points", "Suggestions"])
+            for row in _excel_rows(data):
+                ws.append(row)
+    wb.save(fileobj)
+
+def _nest_batch_pages(doc, first_page, last_node):
+    """
+    Moves pages first_page.. into a new /Pages node under the root, so the root's Kids hold one
+    entry per batch. insert_pdf puts appended pages next to the last existing page; they are taken
+    back out of `last_node` ((xref, kids) of the previous batch node). An incremental save then
+    rewrites only the new batch, its node and the short root, instead of a page list that grows
+    with the whole document. Returns the new node as (xref, kids).
+    """
+    root = int(doc.xref_get_key(doc.pdf_catalog(), "Pages")[1].split()[0])
+    total = doc.page_count
+    pages = [doc.page_xref(i) for i in range(first_page, total)]
+    kids = "[" + " ".join(f"{x} 0 R" for x in pages) + "]"
+    node = doc.get_new_xref()
+    doc.update_object(node, f"<</Type/Pages/Parent {root} 0 R/Kids{kids}/Count {len(pages)}>>")
+    for x in pages:
+        doc.xref_set_key(x, "Parent", f"{node} 0 R")
+    if last_node is None:
+        root_kids = f"[{node} 0 R]"
+    else:
+        prev, prev_kids = last_node
+        doc.xref_set_key(prev, "Kids", prev_kids)
+        doc.xref_set_key(prev, "Count", str(prev_kids.count(" R")))
+        root_kids = doc.xref_get_key(root, "Kids")[1][:-1].rstrip() + f" {node} 0 R]"
+    doc.xref_set_key(root, "Kids", root_kids)
+    doc.xref_set_key(root, "Count", str(total))
+    return node, kids
+
+def write_analyses_pdf(results, fileobj, batch_size=None):
+    """
+    One merged PDF for a cohort: a titled page per analyzed file (same content as
+    export_analysis_to_pdf), written to `fileobj`. FPDF keeps a whole document in memory, so
+    analyses are rendered `batch_size` at a time and each batch is appended to a temporary PDF
+    with an incremental PyMuPDF save, which writes only the new objects (see _nest_batch_pages).
+    Memory stays in the order of one batch whatever the cohort size. Returns the number of
+    analyses written.
+    """
+    batch_size = batch_size or EXPORT_PDF_BATCH
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    written = 0
+    last_node = None
+    pdf = None
+
+    def flush():
+        nonlocal last_node
+        with fitz.open(stream=pdf.output(dest='S').encode('latin-1'), filetype="pdf") as part:
+            with (fitz.open(path) if last_node else fitz.open()) as merged:
+                first_page = merged.page_count
+                merged.insert_pdf(part)
+                node = _nest_batch_pages(merged, first_page, last_node)
+                if last_node:
+                    merged.save(path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+                else:
+                    merged.save(path, garbage=1, deflate=True)
+        last_node = node
+
+    try:
+        for name, data in results:
+            if not data:
+                continue
+            if pdf is None:
+                pdf = FPDF()
+            _pdf_write_analysis(pdf, data, f"Resume Analysis Report - {name}")
+            written += 1
+            if written % batch_size == 0:
+                flush()
+                pdf = None
+        if pdf is not None:
+            flush()
+        if not written:
+            pdf = FPDF()
+            pdf.add_page()
+            pdf.set_font("Arial", size=12)
+            pdf.cell(0, 10, "No analyses to export.", ln=True, align="C")
+            flush()
+        with open(path, "rb") as fh:
+            shutil.copyfileobj(fh, fileobj)
+    finally:
+        os.remove(path)
+    return written
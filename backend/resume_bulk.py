@@ -0,0 +1,107 @@
+# backend/resume_bulk.py
+"""
+Bulk resume analysis: PDFs from a zip archive or a multipart batch are read one at a time and
+fanned out over a ResumePool, yielding each file's result as soon as it finishes.
+
+At most `max_in_flight` files are held in memory at once. Zip entries are decompressed only when
+their turn comes, and an entry whose declared size is over the PDF limit is never
+decompressed.
+"""
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from resume_analyzer import MAX_PDF_BYTES, analysis_cache_key
+from resume_pool import PoolBusy, TaskTimeout
+
+MAX_BULK_FILES = int(os.getenv("RESUME_BULK_MAX_FILES", "1000"))
+BUSY_RETRY_SEC = 0.2
+
+
+def _too_large(name: str) -> Tuple[str, Exception]:
+    return name, ValueError(f"PDF is larger than the {MAX_PDF_BYTES / (1024 * 1024):.1f} MB limit")
+
+
+def iter_zip_pdfs(fileobj, max_files: int = MAX_BULK_FILES) -> Iterator[Tuple[str, Any]]:
+    """Yields (name, bytes or Exception) for every PDF entry of a zip archive, in archive order."""
+    with zipfile.ZipFile(fileobj) as zf:
+        count = 0
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                continue
+            count += 1
+            if count > max_files:
+                yield name, ValueError(f"Archive has more than {max_files} PDFs; the rest were skipped")
+                return
+            if info.file_size > MAX_PDF_BYTES:
+                yield _too_large(name)
+                continue
+            with zf.open(info) as fh:
+                data = fh.read(MAX_PDF_BYTES + 1)
+            yield (_too_large(name) if len(data) > MAX_PDF_BYTES else (name, data))
+
+
+def iter_uploaded_pdfs(files, max_files: int = MAX_BULK_FILES) -> Iterator[Tuple[str, Any]]:
+    """Same as iter_zip_pdfs for a list of (name, binary file object) pairs."""
+    for i, (name, fh) in enumerate(files):
+        if i >= max_files:
+            yield name, ValueError(f"More than {max_files} files; the rest were skipped")
+            return
+        data = fh.read(MAX_PDF_BYTES + 1)
+        yield (_too_large(name) if len(data) > MAX_PDF_BYTES else (name, data))
+
+
+def _error(name: str, e: Exception) -> Dict[str, Any]:
+    status = "timeout" if isinstance(e, TaskTimeout) else "error"
+    return {"file": name, "status": status, "message": str(e)}
+
+
+def analyze_many(pool, items: Iterable[Tuple[str, Any]], max_in_flight: int = None,
+                 cache=None, rule_pack: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields {"file", "status": "ok", "analysis"} or {"file", "status": "error" | "timeout", "message"}
+    per item, in completion order. With a `cache` (see analysis_cache_key), hits are yielded
+    without touching the pool and new analyses are stored.
+    """
+    max_in_flight = max_in_flight or pool.workers * 2
+    in_flight = {}
+    for name, data in items:
+        if isinstance(data, Exception):
+            yield _error(name, data)
+            continue
+        key = analysis_cache_key(data, rule_pack) if cache is not None else None
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            yield {"file": name, "status": "ok", "analysis": cached}
+            continue
+        while True:
+            while len(in_flight) >= max_in_flight:
+                yield from _drain(in_flight, cache)
+            try:
+                in_flight[pool.submit(data, rule_pack)] = (name, key)
+                break
+            except PoolBusy:
+                # the shared pool is full with other traffic: wait for our own work or back off
+                if in_flight:
+                    yield from _drain(in_flight, cache)
+                else:
+                    time.sleep(BUSY_RETRY_SEC)
+    while in_flight:
+        yield from _drain(in_flight, cache)
+
+
+def _drain(in_flight, cache) -> Iterator[Dict[str, Any]]:
+    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+    for fut in done:
+        name, key = in_flight.pop(fut)
+        try:
+            analysis = fut.result()
+        except Exception as e:
+            yield _error(name, e)
+            continue
+        if cache is not None:
+            cache.set(key, analysis)
+        yield {"file": name, "status": "ok", "analysis": analysis}
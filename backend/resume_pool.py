@@ -0,0 +1,254 @@
+# backend/resume_pool.py
+"""
+Bounded process pool for resume parsing.
+
+PDF parsing is CPU-bound and runs native code (PyMuPDF), so it is kept out of the web worker:
+each task is sent to one of `workers` child processes over a pipe. The parent side:
+  - rejects new tasks with PoolBusy once `max_queue` are waiting
+  - kills the worker and raises TaskTimeout when a task runs longer than `timeout_sec`
+  - raises TaskFailed when a worker dies mid-task (segfault, OOM kill) or the task raised
+Dead or killed workers are replaced lazily on the next task. Each worker caps its address space
+at `memory_mb` (where the platform supports RLIMIT_AS), and is recycled after
+`max_tasks_per_worker` tasks.
+
+Workers are separate interpreters (`python -m resume_pool`) talking length-prefixed pickles over
+stdin/stdout. Unlike multiprocessing's spawn, this does not re-import the server's main module
+(app.py loads Whisper at import time), and nothing is inherited from the web server.
+"""
+import io
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+
+LATENCY_WINDOW = 1000  # recent tasks kept for the latency percentiles
+
+
+class PoolBusy(Exception):
+    """Raised by submit() when the queue is full."""
+
+
+class TaskFailed(Exception):
+    """The task raised in the worker, or the worker died while running it."""
+
+
+class TaskTimeout(TaskFailed):
+    """The task exceeded the pool's timeout; its worker was killed."""
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_HEADER = struct.Struct("<Q")
+
+
+def _write_msg(fh, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    fh.write(_HEADER.pack(len(data)))
+    fh.write(data)
+    fh.flush()
+
+
+def _read_msg(fh):
+    header = fh.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise EOFError("worker closed its pipe")
+    (n,) = _HEADER.unpack(header)
+    data = fh.read(n)
+    if len(data) < n:
+        raise EOFError("worker closed its pipe")
+    return pickle.loads(data)
+
+
+def _worker_main(memory_mb: int):
+    # keep the protocol stream private; anything printed by libraries goes to stderr
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    inp = sys.stdin.buffer
+    if memory_mb:
+        try:
+            import resource
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    from resume_analyzer import analyze_resume, extract_text_and_styles
+
+    while True:
+        try:
+            msg = _read_msg(inp)
+        except EOFError:
+            return
+        if msg is None:
+            return
+        op, data, arg = msg
+        try:
+            if op == "text":
+                result = extract_text_and_styles(io.BytesIO(data))[0]
+            else:
+                result = analyze_resume(io.BytesIO(data), arg)
+            _write_msg(out, ("ok", result))
+        except ValueError as e:
+            _write_msg(out, ("invalid", str(e)))
+        except MemoryError:
+            _write_msg(out, ("error", "memory limit exceeded"))
+            return
+        except Exception as e:
+            _write_msg(out, ("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, memory_mb):
+        self.proc = subprocess.Popen([sys.executable, "-m", "resume_pool", str(memory_mb or 0)], cwd=_HERE,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.tasks = 0
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def call(self, task, timeout: float):
+        """Sends one task and waits for its reply; TimeoutError if none arrives in time."""
+        _write_msg(self.proc.stdin, task)
+        reply = {}
+
+        def read():
+            try:
+                reply["msg"] = _read_msg(self.proc.stdout)
+            except Exception as e:
+                reply["error"] = e
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive():
+            raise TimeoutError()
+        if "error" in reply:
+            raise EOFError(str(reply["error"]))
+        return reply["msg"]
+
+    def stop(self, kill: bool = False):
+        if not kill:
+            try:
+                _write_msg(self.proc.stdin, None)
+            except OSError:
+                kill = True
+        if kill:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        for fh in (self.proc.stdin, self.proc.stdout):
+            try:
+                fh.close()
+            except OSError:
+                pass
+
+
+class ResumePool:
+    def __init__(self, workers: int = 2, timeout_sec: float = 30.0, memory_mb: int = 1024, max_queue: int = 64,
+                 max_tasks_per_worker: int = 200):
+        self.workers = workers
+        self.timeout_sec = timeout_sec
+        self.memory_mb = memory_mb
+        self.max_queue = max_queue
+        self.max_tasks_per_worker = max_tasks_per_worker
+        # idle slots; None means "no process yet", filled in on first use
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(None)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-pool")
+        self._lock = threading.Lock()
+        self._counts = {"queued": 0, "running": 0, "completed": 0, "failed": 0, "timeouts": 0, "crashes": 0,
+                        "rejected": 0}
+        self._latency = deque(maxlen=LATENCY_WINDOW)
+        self._wait = deque(maxlen=LATENCY_WINDOW)
+
+    def submit(self, data: bytes, rule_pack: str = None) -> Future:
+        """Queues one PDF (raw bytes) for analyze_resume; the future resolves to its result dict."""
+        return self._submit("analyze", data, rule_pack)
+
+    def analyze(self, data: bytes, rule_pack: str = None) -> Dict[str, Any]:
+        return self.submit(data, rule_pack).result()
+
+    def extract_text(self, data: bytes) -> str:
+        """Plain text of one PDF, as extract_text_and_styles reads it."""
+        return self._submit("text", data, None).result()
+
+    def _submit(self, op: str, data: bytes, arg) -> Future:
+        with self._lock:
+            if self._counts["queued"] >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise PoolBusy("Resume analysis queue is full, try again shortly")
+            self._counts["queued"] += 1
+        return self._executor.submit(self._run, (op, data, arg), time.monotonic())
+
+    def _run(self, task, enqueued_at: float):
+        worker = self._idle.get()
+        started = time.monotonic()
+        with self._lock:
+            self._counts["queued"] -= 1
+            self._counts["running"] += 1
+            self._wait.append(started - enqueued_at)
+        outcome = "failed"
+        try:
+            if worker is None or not worker.alive():
+                worker = _Worker(self.memory_mb)
+            try:
+                status, payload = worker.call(task, self.timeout_sec)
+            except TimeoutError:
+                worker.stop(kill=True)
+                worker, outcome = None, "timeouts"
+                raise TaskTimeout(f"Resume analysis timed out after {self.timeout_sec:g}s")
+            except (EOFError, OSError):
+                worker.stop(kill=True)
+                worker, outcome = None, "crashes"
+                raise TaskFailed("Resume parser crashed on this file")
+            worker.tasks += 1
+            if status == "invalid":
+                raise ValueError(payload)
+            if status != "ok":
+                raise TaskFailed(payload)
+            outcome = "completed"
+            return payload
+        finally:
+            if worker is not None and (worker.tasks >= self.max_tasks_per_worker or not worker.alive()):
+                worker.stop()
+                worker = None
+            self._idle.put(worker)
+            with self._lock:
+                self._counts["running"] -= 1
+                self._counts["completed" if outcome == "completed" else "failed"] += 1
+                if outcome in ("timeouts", "crashes"):
+                    self._counts[outcome] += 1
+                self._latency.append(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        def pct(xs, p):
+            return round(float(np.percentile(xs, p)) * 1000, 2) if xs else None
+
+        with self._lock:
+            latency, wait = list(self._latency), list(self._wait)
+            counts = dict(self._counts)
+        return {
+            "workers": self.workers,
+            "timeout_sec": self.timeout_sec,
+            "memory_mb": self.memory_mb,
+            "max_queue": self.max_queue,
+            "queue_depth": counts.pop("queued"),
+            **counts,
+            "latency_ms": {"p50": pct(latency, 50), "p99": pct(latency, 99)},
+            "queue_wait_ms": {"p50": pct(wait, 50), "p99": pct(wait, 99)},
+        }
+
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
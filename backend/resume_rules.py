@@ -0,0 +1,250 @@
+# backend/resume_rules.py
+"""
+Compiled rule engine for resume scoring.
+
+A rule pack is a JSON object (the built-in "default" pack, or rule_packs/<name>.json, usually
+extending another pack) with:
+    required_sections  ["education", ...]            good point if present, suggestion if missing
+    keyword_rules      [{"any": [...], "good_point": "...", "suggestion": "...", "penalty": 0}]
+                       good_point when any keyword occurs, suggestion/penalty when none does
+    span_rules         [{"when": {...}, "suggestion": "... {text} ...", "penalty": 1}]
+                       conditions: size_lt, size_gt, upper_min_len, flags_any (all must hold)
+    max_fonts          {"limit": 2, "suggestion": "...", "penalty": 5}
+    min_words          {"limit": 250, "suggestion": "...", "penalty": 5}
+    extends            name of the parent pack; lists are appended, max_fonts/min_words replaced
+
+Compiling a pack gathers every section name and keyword into one multi-pattern matcher, so a
+resume costs one lowercasing and one match pass no matter how many rules the pack has. Span
+rules are evaluated as boolean masks over the extractor's span columns.
+"""
+import hashlib
+import json
+import os
+from collections import deque
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+RULE_PACK_DIR = os.getenv("RESUME_RULE_PACK_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_packs"))
+# below this many patterns, one C-level substring search per pattern beats a pure-Python automaton walk
+AUTOMATON_MIN_PATTERNS = 200
+
+DEFAULT_PACK = {
+    "required_sections": ["education", "experience", "skills", "projects"],
+    "keyword_rules": [
+        {"any": ["project"], "good_point": "Includes project section."},
+        {"any": ["internship", "experience"], "good_point": "Work experience is listed."},
+        {"any": ["summary", "objective"], "good_point": "Professional summary included."},
+    ],
+    "span_rules": [
+        {"when": {"size_lt": 9}, "suggestion": "Text '{text}' font size too small. Use at least 10pt.", "penalty": 1},
+        {"when": {"size_gt": 15}, "suggestion": "Text '{text}' font size too large. Keep headings below 15pt.",
+         "penalty": 1},
+        {"when": {"upper_min_len": 6}, "suggestion": "Text '{text}' is all uppercase — avoid excessive capitalization.",
+         "penalty": 0},
+    ],
+    "max_fonts": {"limit": 2, "suggestion": "Too many font styles used. Use a consistent font (1–2 max).", "penalty": 5},
+    "min_words": {"limit": 250, "suggestion": "Resume seems short — consider adding more content.", "penalty": 5},
+}
+
+
+class MultiPatternMatcher:
+    """Finds which of a fixed set of lowercase patterns occur in a text (substring semantics)."""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._use_automaton = len(self.patterns) >= AUTOMATON_MIN_PATTERNS
+        if self._use_automaton:
+            self._build()
+
+    def _build(self):
+        # Aho–Corasick: trie transitions, failure links, and per-state output sets that include
+        # the outputs reachable through failure links
+        goto, fail, out = [{}], [0], [set()]
+        for i, pat in enumerate(self.patterns):
+            state = 0
+            for ch in pat:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    fail.append(0)
+                    out.append(set())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            out[state].add(i)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                out[nxt] |= out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, [frozenset(o) for o in out]
+
+    def find(self, text: str) -> Set[str]:
+        if not self._use_automaton:
+            return {p for p in self.patterns if p in text}
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+                if len(found) == len(self.patterns):
+                    break
+        return {self.patterns[i] for i in found}
+
+
+def _merge(parent: Dict[str, Any], child: Dict[str, Any]) -> Dict[str, Any]:
+    pack = dict(parent)
+    for key, value in child.items():
+        if key == "extends":
+            continue
+        if key == "required_sections":
+            pack[key] = list(dict.fromkeys(parent.get(key, []) + value))
+        elif isinstance(value, list):
+            pack[key] = parent.get(key, []) + value
+        else:
+            pack[key] = value
+    return pack
+
+
+def _file_stamp(path: str) -> tuple:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _resolve(name: str, seen=(), files: list = None) -> Dict[str, Any]:
+    """Merged pack for `name`; the stamp of every JSON file read on the way is appended to `files`."""
+    if name == "default":
+        return DEFAULT_PACK
+    if name in seen:
+        raise ValueError(f"Rule pack '{name}' extends itself")
+    if not name.replace("_", "").replace("-", "").isalnum():
+        raise ValueError(f"Invalid rule pack name: {name}")
+    path = os.path.join(RULE_PACK_DIR, name + ".json")
+    if not os.path.exists(path):
+        raise ValueError(f"Unknown rule pack: {name}")
+    if files is not None:
+        # stat before reading, so an edit racing the read changes the stamp
+        files.append(_file_stamp(path))
+    with open(path, "r", encoding="utf-8") as fh:
+        child = json.load(fh)
+    return _merge(_resolve(child.get("extends", "default"), seen + (name,), files), child)
+
+
+class CompiledRules:
+    def __init__(self, name: str, pack: Dict[str, Any]):
+        self.name = name
+        self.pack = pack
+        self.fingerprint = hashlib.sha1(json.dumps(pack, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.sections = [s.lower() for s in pack.get("required_sections", [])]
+        self.keyword_rules = [dict(r, any=[k.lower() for k in r["any"]]) for r in pack.get("keyword_rules", [])]
+        self.span_rules = pack.get("span_rules", [])
+        self.max_fonts = pack.get("max_fonts")
+        self.min_words = pack.get("min_words")
+        self.matcher = MultiPatternMatcher(self.sections + [k for r in self.keyword_rules for k in r["any"]])
+
+    def _span_mask(self, when: Dict[str, Any], spans, upper: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(spans), dtype=bool)
+        if "size_lt" in when:
+            mask &= spans.size < when["size_lt"]
+        if "size_gt" in when:
+            mask &= spans.size > when["size_gt"]
+        if "upper_min_len" in when:
+            mask &= upper & (lengths >= when["upper_min_len"])
+        if "flags_any" in when:
+            mask &= (spans.flags & int(when["flags_any"])) != 0
+        return mask
+
+    def evaluate(self, text: str, spans) -> Dict[str, Any]:
+        lowered = text.lower()
+        found = self.matcher.find(lowered)
+        n_words = len(text.split())
+
+        score = 100
+        suggestions = []
+        good_points = []
+
+        present_sections = [s for s in self.sections if s in found]
+        for section in present_sections:
+            good_points.append(f"{section.capitalize()} section is included.")
+        for ms in self.sections:
+            if ms not in found:
+                suggestions.append(f"Missing important section: {ms.capitalize()}.")
+
+        if self.max_fonts and len(spans.fonts) > self.max_fonts["limit"]:
+            suggestions.append(self.max_fonts["suggestion"])
+            score -= self.max_fonts.get("penalty", 0)
+
+        if len(spans) and self.span_rules:
+            texts = np.asarray(spans.texts, dtype=str)
+            upper = np.strings.isupper(texts) if hasattr(np, "strings") else np.char.isupper(texts)
+            lengths = np.strings.str_len(texts) if hasattr(np, "strings") else np.char.str_len(texts)
+            for rule in self.span_rules:
+                hits = np.flatnonzero(self._span_mask(rule["when"], spans, upper, lengths))
+                score -= rule.get("penalty", 0) * len(hits)
+                suggestions.extend(rule["suggestion"].format(text=spans.texts[i]) for i in hits)
+
+        if self.min_words and n_words < self.min_words["limit"]:
+            suggestions.append(self.min_words["suggestion"])
+            score -= self.min_words.get("penalty", 0)
+
+        for rule in self.keyword_rules:
+            if any(k in found for k in rule["any"]):
+                if rule.get("good_point"):
+                    good_points.append(rule["good_point"])
+            elif rule.get("suggestion"):
+                suggestions.append(rule["suggestion"])
+                score -= rule.get("penalty", 0)
+
+        details = [
+            f"Font styles used: {', '.join(spans.fonts)}",
+            f"Sections found: {', '.join(present_sections)}"
+        ]
+        if spans.truncated:
+            details.append(f"Only the first {spans.pages} pages were analyzed.")
+
+        return {
+            "score": max(score, 0),
+            "summary": f"The resume contains {n_words} words.",
+            "details": details,
+            "good_points": good_points,
+            # deduplicated, first occurrence first
+            "suggestions": list(dict.fromkeys(suggestions)),
+        }
+
+
+# name -> (stamps of the pack files it was compiled from, compiled rules)
+_compiled: Dict[str, Tuple[tuple, CompiledRules]] = {}
+
+
+def get_rules(name: str = None) -> CompiledRules:
+    """
+    Compiled rule pack by name ("default" when empty). A pack is recompiled when a JSON file on
+    its extends chain has changed since it was compiled, so edits apply without a restart.
+    """
+    name = (name or "default").strip().lower()
+    cached = _compiled.get(name)
+    if cached is not None and all(_file_stamp(stamp[0]) == stamp for stamp in cached[0]):
+        return cached[1]
+    files = []
+    rules = CompiledRules(name, _resolve(name, files=files))
+    _compiled[name] = (tuple(files), rules)
+    return rules
+
+
+def available_packs() -> List[str]:
+    names = ["default"]
+    if os.path.isdir(RULE_PACK_DIR):
+        names += sorted(f[:-5] for f in os.listdir(RULE_PACK_DIR) if f.endswith(".json"))
+    return names
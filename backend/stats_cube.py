@@ -0,0 +1,167 @@
+# backend/stats_cube.py
+"""
+Pre-aggregated recommendation stats.
+
+For every skill, and for every pair of skills that co-occur on some row, the cube stores the
+number of matching rows, their package sum, and sparse counts per company and per role. The
+stats of a one- or two-skill query ("rows having any of these skills") then come from at most
+three table rows via inclusion-exclusion, independent of the dataset size:
+
+    |A or B| = |A| + |B| - |A and B|
+
+Queries with more skills use the matched subset instead (see stats_for_rows), and so do one-
+and two-skill queries whose average package lands within float error of a rounding half-point:
+the cube's sums are accumulated in a different order than a plain mean of the matched rows,
+so only the row path is guaranteed to round the same way.
+
+Memory: a row with k skills has k*(k-1)/2 pairs. Building the pair tables takes about 75 bytes
+per such row-pair transiently (keys, row ids, their sort and the incidence matrix); the stored
+tables are one entry per distinct pair plus its non-zero company/role counts. Above
+MAX_PAIR_ENTRIES row-pairs the pair tables are not built and two-skill queries use the row
+path as well.
+"""
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+TOP_N = 5
+# row-pair budget for the pair tables, about 750 MB of transient build memory at the default
+MAX_PAIR_ENTRIES = int(os.getenv("STATS_CUBE_MAX_PAIR_ENTRIES", "10000000"))
+# relative float error tolerated before an average counts as sitting on a rounding half-point
+ROUNDING_GUARD = 1e-9
+
+
+def _one_hot(codes: np.ndarray, n: int) -> sparse.csr_matrix:
+    """Row-by-category indicator matrix; rows with code -1 (missing) get no entry."""
+    rows = np.flatnonzero(codes >= 0)
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, codes[rows])), shape=(len(codes), n))
+
+
+def _pair_incidence(skill_matrix: sparse.csr_matrix):
+    """
+    Returns (pair_keys, row_by_pair) where pair_keys are sorted a * n_skills + b (a < b) for
+    every co-occurring skill pair and row_by_pair is the (rows x pairs) incidence matrix, or
+    None when the rows hold more than MAX_PAIR_ENTRIES pairs.
+    """
+    n_skills = skill_matrix.shape[1]
+    indptr, indices = skill_matrix.indptr, skill_matrix.indices
+    lengths = np.diff(indptr)
+    if int((lengths.astype(np.int64) * (lengths - 1) // 2).sum()) > MAX_PAIR_ENTRIES:
+        return None
+    row_parts, key_parts = [], []
+    # rows with the same number of skills are handled together as one (n_rows, k) block
+    for k in np.unique(lengths[lengths >= 2]):
+        rows = np.flatnonzero(lengths == k)
+        ids = indices[indptr[rows][:, np.newaxis] + np.arange(k)].astype(np.int64)
+        a, b = np.triu_indices(k, 1)
+        key_parts.append((ids[:, a] * n_skills + ids[:, b]).ravel())
+        row_parts.append(np.repeat(rows, len(a)))
+    if not key_parts:
+        return np.empty(0, dtype=np.int64), sparse.csr_matrix((skill_matrix.shape[0], 0), dtype=np.int64)
+    keys = np.concatenate(key_parts)
+    pair_keys, pair_ids = np.unique(keys, return_inverse=True)
+    incidence = sparse.csr_matrix((np.ones(len(keys), dtype=np.int64), (np.concatenate(row_parts), pair_ids)),
+                                  shape=(skill_matrix.shape[0], len(pair_keys)))
+    return pair_keys, incidence
+
+
+def build_stats_cube(skill_matrix: sparse.csr_matrix, company_codes: np.ndarray, role_codes: np.ndarray,
+                     packages: np.ndarray, company_names: List[str], role_names: List[str]) -> Dict[str, Any]:
+    companies = _one_hot(np.asarray(company_codes), len(company_names))
+    roles = _one_hot(np.asarray(role_codes), len(role_names))
+    packages = np.asarray(packages, dtype=np.float64)
+    by_skill = skill_matrix.T.tocsr().astype(np.int64)
+    pairs = _pair_incidence(skill_matrix)
+    cube = {
+        "n_rows": skill_matrix.shape[0],
+        "n_skills": skill_matrix.shape[1],
+        "company_names": list(company_names),
+        "role_names": list(role_names),
+        "skill_count": np.asarray(by_skill.sum(axis=1)).ravel(),
+        "skill_package": by_skill @ packages,
+        "skill_company": (by_skill @ companies).tocsr(),
+        "skill_role": (by_skill @ roles).tocsr(),
+        "pair_keys": None,
+    }
+    if pairs is not None:
+        pair_keys, row_by_pair = pairs
+        by_pair = row_by_pair.T.tocsr()
+        cube.update({
+            "pair_keys": pair_keys,
+            "pair_count": np.asarray(by_pair.sum(axis=1)).ravel(),
+            "pair_package": by_pair @ packages,
+            "pair_company": (by_pair @ companies).tocsr(),
+            "pair_role": (by_pair @ roles).tocsr(),
+        })
+    return cube
+
+
+def _top(counts: sparse.csr_matrix, names: List[str]) -> Dict[str, int]:
+    """Top TOP_N categories by count from a 1 x n sparse row; ties go to the lower (alphabetical) code."""
+    counts = counts.tocsr()
+    counts.eliminate_zeros()
+    order = np.lexsort((counts.indices, -counts.data))[:TOP_N]
+    return {names[counts.indices[i]]: int(counts.data[i]) for i in order}
+
+
+def _format(cube, count, package_sum, company_counts, role_counts) -> Dict[str, Any]:
+    count = int(count)
+    if count == 0:
+        return {"matched_count": 0, "matched_pct": 0.0, "avg_package": 0.0, "top_companies": {}, "top_roles": {}}
+    return {
+        "matched_count": count,
+        "matched_pct": round(count / max(cube["n_rows"], 1) * 100, 2),
+        "avg_package": round(float(package_sum) / count, 2),
+        "top_companies": _top(company_counts, cube["company_names"]),
+        "top_roles": _top(role_counts, cube["role_names"]),
+    }
+
+
+def _near_half_point(package_sum: float, count: int, magnitude: float) -> bool:
+    """True when round(package_sum / count, 2) could flip with float error of order `magnitude`."""
+    cents = package_sum / count * 100
+    return abs(cents - np.floor(cents) - 0.5) <= ROUNDING_GUARD * (magnitude / count * 100 + 1)
+
+
+def stats_for_skills(cube: Dict[str, Any], skill_ids: List[int]) -> Optional[Dict[str, Any]]:
+    """Stats block for rows having any of 1 or 2 skills; None when the query needs stats_for_rows."""
+    ids = sorted(set(skill_ids))
+    if len(ids) == 1:
+        a = ids[0]
+        count, package_sum = cube["skill_count"][a], cube["skill_package"][a]
+        if count and _near_half_point(package_sum, count, abs(package_sum)):
+            return None
+        return _format(cube, count, package_sum, cube["skill_company"][a], cube["skill_role"][a])
+    if len(ids) != 2 or cube["pair_keys"] is None:
+        return None
+    a, b = ids
+    count = cube["skill_count"][a] + cube["skill_count"][b]
+    package_sum = cube["skill_package"][a] + cube["skill_package"][b]
+    magnitude = abs(cube["skill_package"][a]) + abs(cube["skill_package"][b])
+    company_counts = cube["skill_company"][a] + cube["skill_company"][b]
+    role_counts = cube["skill_role"][a] + cube["skill_role"][b]
+    key = a * cube["n_skills"] + b
+    p = int(np.searchsorted(cube["pair_keys"], key))
+    if p < len(cube["pair_keys"]) and cube["pair_keys"][p] == key:
+        count -= cube["pair_count"][p]
+        package_sum -= cube["pair_package"][p]
+        magnitude += abs(cube["pair_package"][p])
+        company_counts = company_counts - cube["pair_company"][p]
+        role_counts = role_counts - cube["pair_role"][p]
+    if count and _near_half_point(package_sum, count, magnitude):
+        return None
+    return _format(cube, count, package_sum, company_counts, role_counts)
+
+
+def stats_for_rows(cube: Dict[str, Any], rows: np.ndarray, company_codes: np.ndarray, role_codes: np.ndarray,
+                   packages: np.ndarray) -> Dict[str, Any]:
+    """Same stats block computed directly from an explicit set of matched rows."""
+    rows = np.asarray(rows)
+    comp = np.asarray(company_codes)[rows]
+    role = np.asarray(role_codes)[rows]
+    company_counts = np.bincount(comp[comp >= 0], minlength=len(cube["company_names"]))
+    role_counts = np.bincount(role[role >= 0], minlength=len(cube["role_names"]))
+    return _format(cube, len(rows), np.asarray(packages, dtype=np.float64)[rows].sum(),
+                   sparse.csr_matrix(company_counts), sparse.csr_matrix(role_counts))
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry  # noqa: E402
+import opportunity_model  # noqa: E402
+
+
+@pytest.fixture
+def trained_model(tmp_path, monkeypatch):
+    """A small forest trained on the bundled dataset into a temporary model dir."""
+    monkeypatch.setattr(opportunity_model, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(opportunity_model, "MODEL_PATH", str(tmp_path / "opportunity_model.joblib"))
+    monkeypatch.setattr(opportunity_model, "N_ESTIMATORS", 10)
+    monkeypatch.setattr(model_registry, "_bundle", None)
+    monkeypatch.setattr(model_registry, "_last_check", 0.0)
+    opportunity_model.train_model()
+    return opportunity_model.load_model()
@@ -0,0 +1,18 @@
+import numpy as np
+
+import opportunity_model
+from tree_engine import predict_compiled
+
+
+def test_compiled_backend_matches_sklearn(trained_model):
+    assert trained_model["compiled"] is not None
+    df = opportunity_model.load_dataset()
+    students = [{"branch": r.Branch, "cgpa": r.CGPA, "skills": r.Skills, "year": r.Year} for r in df.itertuples()]
+    X = opportunity_model._build_input_matrix(trained_model, students)
+    rng = np.random.RandomState(0)
+    X = np.vstack([X, (rng.rand(500, X.shape[1]) < 0.05).astype(np.float32)])
+
+    compiled = predict_compiled(trained_model["compiled"], X)
+    models = opportunity_model.model_registry.bundle_models(trained_model)
+    for target in ("role", "company", "package"):
+        np.testing.assert_array_equal(compiled[target], opportunity_model._forest_predict(models[target], X))
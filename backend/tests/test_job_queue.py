@@ -0,0 +1,50 @@
+import threading
+
+from job_queue import JobQueue, JobCancelled
+
+
+def test_events_are_delivered_in_order_until_the_job_ends():
+    release = threading.Event()
+
+    def work(progress=None, cancel_event=None):
+        for i in range(3):
+            progress(i / 3, event=i)
+        release.wait(5)
+        progress(1.0, event=3)
+        return "done"
+
+    jobs = JobQueue("test")
+    job_id = jobs.submit(work)
+    seen = []
+    while True:
+        job, events = jobs.events(job_id, len(seen), timeout=5)
+        seen += events
+        if len(seen) == 3:
+            release.set()
+        if job["status"] == "succeeded":
+            break
+    assert seen == [0, 1, 2, 3]
+    assert job["result"] == "done"
+    assert "_events" not in job
+
+
+def test_events_wakes_up_on_cancel_of_a_queued_job():
+    block = threading.Event()
+    cleaned = []
+
+    def work(progress=None, cancel_event=None):
+        block.wait(5)
+        if cancel_event.is_set():
+            raise JobCancelled()
+
+    jobs = JobQueue("test", max_workers=1)
+    running = jobs.submit(work)
+    queued = jobs.submit(work, cleanup=lambda: cleaned.append(True))
+    threading.Timer(0.05, jobs.cancel, (queued,)).start()
+    job, events = jobs.events(queued, timeout=5)
+    assert job["status"] == "cancelled" and events == [] and cleaned == [True]
+
+    jobs.cancel(running)
+    block.set()
+    assert jobs.wait(running, timeout=5)["status"] == "cancelled"
+    assert jobs.events("missing") == (None, [])
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+import minhash_lsh
+from minhash_lsh import MinHashLSH
+
+
+def _random_sets(n, vocab=200, seed=0):
+    rng = np.random.RandomState(seed)
+    rows = [rng.choice(vocab, size=rng.randint(0, 8), replace=False) for _ in range(n)]
+    indptr = np.concatenate(([0], np.cumsum([len(r) for r in rows])))
+    indices = np.concatenate(rows).astype(np.int64)
+    return sp.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, vocab))
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_incremental_add_matches_full_build(monkeypatch, merge):
+    # added rows stay in the pending dicts until merged into the sorted band arrays
+    monkeypatch.setattr(minhash_lsh, "MERGE_FRACTION", 1.0)
+    sets = _random_sets(3000)
+    full = MinHashLSH()
+    full.build(sets.indptr, sets.indices)
+
+    incremental = MinHashLSH()
+    first = sets[:1000]
+    incremental.build(first.indptr, first.indices)
+    for start in range(1000, 3000, 700):
+        part = sets[start:start + 700]
+        incremental.add(np.arange(start, start + part.shape[0]), part.indptr, part.indices)
+    assert incremental._n_pending > 0
+    if merge:
+        with incremental._lock:
+            incremental._merge_locked()
+        assert incremental._n_pending == 0
+
+    assert incremental.size == full.size == 3000
+    for i in range(0, 3000, 7):
+        ids = sets.indices[sets.indptr[i]:sets.indptr[i + 1]].tolist()
+        expected = full.candidates(ids)
+        np.testing.assert_array_equal(incremental.candidates(ids), expected)
+        if ids:
+            assert i in expected
+
+
+def test_empty_sets_are_not_indexed():
+    index = MinHashLSH()
+    index.build(np.array([0, 0, 2]), np.array([3, 5]))
+    index.add(np.array([2, 3]), np.array([0, 0, 2]), np.array([3, 5]))
+    assert index.size == 4
+    np.testing.assert_array_equal(index.candidates([3, 5]), [1, 3])
+    assert len(index.candidates([])) == 0
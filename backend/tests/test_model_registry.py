@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import model_registry
+import opportunity_model
+
+
+def test_prune_keeps_newest_and_current_versions(trained_model, monkeypatch):
+    model_dir = opportunity_model.MODEL_DIR
+    versions_dir = os.path.join(model_dir, "versions")
+    monkeypatch.setattr(model_registry, "KEEP_VERSIONS", 2)
+    first = model_registry.current_version(model_dir)
+    for _ in range(3):
+        opportunity_model.train_model()
+    remaining = sorted(os.listdir(versions_dir))
+    assert remaining[-1] == model_registry.current_version(model_dir)
+    assert len(remaining) == 2 and first not in remaining
+
+    # CURRENT moved back to an older version by another process is not pruned
+    oldest = remaining[0]
+    real_current = model_registry.current_version
+    monkeypatch.setattr(model_registry, "current_version", lambda d: oldest)
+    opportunity_model.train_model()
+    monkeypatch.setattr(model_registry, "current_version", real_current)
+    assert oldest in os.listdir(versions_dir)
+
+
+def test_versions_published_in_the_same_second_sort_in_order():
+    versions = [model_registry._new_version() for _ in range(50)]
+    assert versions == sorted(versions)
+
+
+def test_lazy_forest_load_survives_prune(trained_model):
+    model_dir = opportunity_model.MODEL_DIR
+    version = model_registry.current_version(model_dir)
+    bundle = model_registry._load_version(model_dir, version, use_compiled=True)
+    shutil.rmtree(os.path.join(model_dir, "versions", version))
+    assert sorted(model_registry.bundle_models(bundle)) == ["company", "package", "role"]
@@ -0,0 +1,41 @@
+import opportunity_model
+from opportunity_model import predict_opportunity, predict_opportunity_batch
+
+
+def test_mixed_case_keys_match_single_prediction(trained_model):
+    students = [
+        {"Branch": "CSE", "branch": "", "CGPA": 8.5, "Skills": "python, sql", "year": 2023, "StudentName": "a"},
+        {"branch": "ECE", " CGPA ": "7", "skills": ["java"], "Year": 2024},
+        {"branch": None, "Branch": "IT", "cgpa": None, "CGPA": 9},
+    ]
+    results = list(predict_opportunity_batch(students, chunk_size=2))
+
+    assert [r["row"] for r in results] == [0, 1, 2]
+    assert results[0]["StudentName"] == "a"
+    expected = [
+        predict_opportunity("CSE", 8.5, ["python", "sql"], 2023),
+        predict_opportunity("ECE", 7.0, ["java"], 2024),
+        predict_opportunity("IT", 9.0, [], 0),
+    ]
+    assert [r["prediction"] for r in results] == expected
+
+
+def test_normalize_keys_first_non_empty_wins():
+    assert opportunity_model._normalize_keys({"Branch": "", " branch": "CSE", "BRANCH": "IT"}) == {"branch": "CSE"}
+    assert opportunity_model._normalize_keys({"Skills": ["sql"], "skills": []}) == {"skills": ["sql"]}
+
+
+def test_failed_chunk_does_not_end_stream(trained_model, monkeypatch):
+    predict_chunk = opportunity_model._predict_chunk
+
+    def flaky(bundle, students, offset):
+        if offset == 2:
+            raise ValueError("bad chunk")
+        return predict_chunk(bundle, students, offset)
+
+    monkeypatch.setattr(opportunity_model, "_predict_chunk", flaky)
+    students = [{"branch": "CSE", "cgpa": 8, "skills": "python"}] * 5
+    results = list(predict_opportunity_batch(students, chunk_size=2))
+
+    assert [r.get("row") for r in results] == [0, 1, None, 4]
+    assert results[2] == {"status": "error", "rows": [2, 3], "message": "bad chunk"}
@@ -0,0 +1,31 @@
+import os
+
+from result_cache import DiskCache
+
+
+def test_disk_cache_keeps_other_versions_on_startup(tmp_path):
+    old = DiskCache(str(tmp_path), "v1")
+    old.set("a", {"x": 1})
+    new = DiskCache(str(tmp_path), "v2")
+    new.set("a", {"x": 2})
+
+    # a worker of either release starting up leaves the other's entries alone
+    DiskCache(str(tmp_path), "v1")
+    DiskCache(str(tmp_path), "v2")
+    assert old.get("a") == {"x": 1}
+    assert new.get("a") == {"x": 2}
+
+
+def test_disk_cache_evicts_stale_versions_first(tmp_path):
+    old = DiskCache(str(tmp_path), "v1")
+    old.set("a", {"x": 1})
+    os.utime(os.path.join(str(tmp_path), "v1-a.json"), (1, 1))
+
+    new = DiskCache(str(tmp_path), "v2", max_entries=2)
+    new.set("b", {"x": 2})
+    assert new.stats()["size"] == 2
+    new.set("c", {"x": 3})
+
+    assert sorted(os.listdir(str(tmp_path))) == ["v2-b.json", "v2-c.json"]
+    assert new.get("b") == {"x": 2}
+    assert new.stats()["size"] == 2
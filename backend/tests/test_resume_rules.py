@@ -0,0 +1,33 @@
+import json
+import os
+
+import pytest
+
+import resume_rules
+
+
+def _write(path, pack, mtime):
+    path.write_text(json.dumps(pack), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_edited_pack_is_recompiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_rules, "RULE_PACK_DIR", str(tmp_path))
+    monkeypatch.setattr(resume_rules, "_compiled", {})
+    _write(tmp_path / "base.json", {"required_sections": ["awards"]}, 1_000_000)
+    _write(tmp_path / "child.json", {"extends": "base"}, 1_000_000)
+
+    rules = resume_rules.get_rules("child")
+    assert resume_rules.get_rules(" Child ") is rules
+    assert "awards" in rules.sections
+
+    # editing the parent invalidates the child as well
+    _write(tmp_path / "base.json", {"required_sections": ["hobbies"]}, 1_000_010)
+    edited = resume_rules.get_rules("child")
+    assert edited is not rules
+    assert edited.fingerprint != rules.fingerprint
+    assert "hobbies" in edited.sections and "awards" not in edited.sections
+
+    os.remove(tmp_path / "child.json")
+    with pytest.raises(ValueError):
+        resume_rules.get_rules("child")
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+import opportunity_model as om
+
+TOP_K = 10
+# measured on the bundled dataset: mean recall@10 about 0.90, about 10% of rows scored
+MIN_MEAN_RECALL = 0.85
+MAX_CANDIDATE_FRACTION = 0.2
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """The bundled dataset loaded afresh (columnar cache in tmp_path), so the LSH index is built for this test."""
+    monkeypatch.setattr(om, "DATA_CACHE_DIR", str(tmp_path / "cache"))
+    df = om.reload_dataset()
+    assert om._similar_index.size == len(df)
+    return df
+
+
+def sample_queries(n, seed=0):
+    """Skill sets of random dataset rows with one skill dropped or one added."""
+    rng = random.Random(seed)
+    vocab = sorted(om._skill_vocab)
+    n_rows = om._skill_matrix.shape[0]
+    queries = []
+    while len(queries) < n:
+        skills = om.skills_for_row(rng.randrange(n_rows))
+        if len(skills) > 1 and rng.random() < 0.5:
+            skills.remove(rng.choice(skills))
+        else:
+            skills.append(rng.choice(vocab))
+        queries.append(skills)
+    return queries
+
+
+def tie_aware_recall(approx, exact):
+    """Share of the exact top-k matched; any result scoring at least the exact k-th best counts."""
+    if not exact:
+        return 1.0
+    threshold = exact[-1]["jaccard"]
+    return min(sum(r["jaccard"] >= threshold for r in approx), len(exact)) / len(exact)
+
+
+def test_approximate_recall_against_exact(dataset):
+    n_rows = len(dataset)
+    recalls, fractions = [], []
+    for q in sample_queries(300):
+        approx = om.similar_students(q, TOP_K)
+        exact = om.similar_students(q, TOP_K, exact=True)
+        assert approx["mode"] == "approximate" and exact["candidates"] == n_rows
+        recalls.append(tie_aware_recall(approx["students"], exact["students"]))
+        fractions.append(approx["candidates"] / n_rows)
+
+    assert np.mean(recalls) >= MIN_MEAN_RECALL
+    assert np.mean(fractions) <= MAX_CANDIDATE_FRACTION
+
+
+def test_exact_results_are_ranked_by_jaccard(dataset):
+    query = om.skills_for_row(0)
+    students = om.similar_students(query, TOP_K, exact=True)["students"]
+    scores = [s["jaccard"] for s in students]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == 1.0
@@ -0,0 +1,39 @@
+import itertools
+
+import pandas as pd
+
+import opportunity_model as om
+import stats_cube
+
+
+def _stats(skill_ids, df):
+    names = [om._skill_names[i] for i in skill_ids]
+    rows = om.rows_with_any_skill(names)
+    stats = stats_cube.stats_for_skills(om._stats_cube, skill_ids)
+    if stats is None:
+        stats = stats_cube.stats_for_rows(om._stats_cube, rows, df["Company"].cat.codes.to_numpy(),
+                                          df["JobRole"].cat.codes.to_numpy(), df["Package"].to_numpy(dtype=float))
+    return rows, stats
+
+
+def test_cube_matches_a_plain_mean_of_the_matched_rows():
+    df = om.load_dataset()
+    packages = df["Package"].to_numpy(dtype=float)
+    n_skills = om._stats_cube["n_skills"]
+    queries = [[a] for a in range(n_skills)] + [list(q) for q in itertools.combinations(range(n_skills), 2)]
+    for q in queries:
+        rows, stats = _stats(q, df)
+        assert stats["matched_count"] == len(rows)
+        if len(rows):
+            assert stats["avg_package"] == round(float(pd.Series(packages[rows]).mean()), 2), q
+
+
+def test_pair_tables_are_skipped_above_the_budget(monkeypatch):
+    df = om.load_dataset()
+    monkeypatch.setattr(stats_cube, "MAX_PAIR_ENTRIES", 1)
+    cube = stats_cube.build_stats_cube(om._skill_matrix, df["Company"].cat.codes.to_numpy(),
+                                       df["JobRole"].cat.codes.to_numpy(), df["Package"].to_numpy(dtype=float),
+                                       [str(c) for c in df["Company"].cat.categories],
+                                       [str(c) for c in df["JobRole"].cat.categories])
+    assert cube["pair_keys"] is None
+    assert stats_cube.stats_for_skills(cube, [0, 1]) is None
@@ -0,0 +1,14 @@
+import os
+
+import opportunity_model
+
+
+def test_forests_share_the_configured_cores(monkeypatch):
+    monkeypatch.setattr(opportunity_model, "TRAIN_N_JOBS", 6)
+    assert opportunity_model._train_jobs_per_forest(3) == 2
+    monkeypatch.setattr(opportunity_model, "TRAIN_N_JOBS", 2)
+    assert opportunity_model._train_jobs_per_forest(3) == 1
+
+    monkeypatch.setattr(opportunity_model, "TRAIN_N_JOBS", -1)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    assert opportunity_model._train_jobs_per_forest(3) == max(1, cores // 3)
@@ -0,0 +1,132 @@
+# backend/tree_engine.py
+"""
+Compiled inference for the opportunity forests.
+
+Every fitted tree of every target (role, company, package) is flattened into one set of
+contiguous node arrays (feature, threshold, left, right). A batch is evaluated by walking
+all trees for all rows at once, one depth level per step, and the per-leaf values are then
+accumulated tree by tree in the same order sklearn uses, so predictions match exactly.
+
+The compiled form is a plain dict of NumPy arrays. It is saved as a directory with one .npy
+file per array, which loads without unpickling any sklearn objects and can be memory-mapped.
+"""
+import os
+from typing import Dict, Any, Optional
+import numpy as np
+
+TREE_LEAF = -1
+# upper bound on (trees x rows) node ids held in memory during one traversal step
+MAX_TRAVERSAL_CELLS = 4_000_000
+
+
+def compile_forests(models: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Flattens {target: fitted RandomForest*} into contiguous node arrays."""
+    features, thresholds, lefts, rights, roots = [], [], [], [], []
+    compiled = {"targets": np.array(list(models.keys()))}
+    offset = 0
+    max_depth = 0
+    for name, model in models.items():
+        tree_start = len(roots)
+        node_start = offset
+        leaf_values = []
+        is_classifier = hasattr(model, "classes_")
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            ids = np.arange(offset, offset + n, dtype=np.int32)
+            leaf = t.children_left == TREE_LEAF
+            # leaves point at themselves so extra traversal steps are no-ops
+            lefts.append(np.where(leaf, ids, t.children_left + offset).astype(np.int32))
+            rights.append(np.where(leaf, ids, t.children_right + offset).astype(np.int32))
+            features.append(np.where(leaf, 0, t.feature).astype(np.int32))
+            thresholds.append(t.threshold.astype(np.float64))
+            roots.append(offset)
+            if is_classifier:
+                # same normalization DecisionTreeClassifier.predict_proba applies per call
+                proba = t.value[:, 0, :].copy()
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                leaf_values.append(proba / normalizer)
+            else:
+                leaf_values.append(t.value[:, 0, 0].copy())
+            max_depth = max(max_depth, int(t.max_depth))
+            offset += n
+        compiled[f"{name}__trees"] = np.array([tree_start, len(roots)], dtype=np.int64)
+        compiled[f"{name}__node_offset"] = np.array(node_start, dtype=np.int64)
+        compiled[f"{name}__values"] = np.concatenate(leaf_values)
+        if is_classifier:
+            compiled[f"{name}__classes"] = np.asarray(model.classes_).astype(str)
+    compiled["feature"] = np.concatenate(features)
+    compiled["threshold"] = np.concatenate(thresholds)
+    compiled["left"] = np.concatenate(lefts)
+    compiled["right"] = np.concatenate(rights)
+    compiled["roots"] = np.array(roots, dtype=np.int32)
+    compiled["is_leaf"] = compiled["left"] == np.arange(len(compiled["left"]))
+    compiled["max_depth"] = np.array(max_depth, dtype=np.int64)
+    return compiled
+
+
+def save_compiled(compiled: Dict[str, np.ndarray], path: str):
+    """Writes one <name>.npy per array into directory `path`."""
+    os.makedirs(path, exist_ok=True)
+    for name, arr in compiled.items():
+        np.save(os.path.join(path, name + ".npy"), np.asarray(arr), allow_pickle=False)
+
+
+def load_compiled(path: str, mmap_mode: Optional[str] = "r") -> Dict[str, np.ndarray]:
+    """Loads a directory written by save_compiled; arrays are memory-mapped read-only by default."""
+    compiled = {}
+    for fn in os.listdir(path):
+        if fn.endswith(".npy"):
+            arr = np.load(os.path.join(path, fn), mmap_mode=mmap_mode, allow_pickle=False)
+            # 0-d scalars are tiny; keep them as plain arrays rather than maps
+            compiled[fn[:-4]] = np.asarray(arr) if arr.ndim == 0 else arr
+    return compiled
+
+
+def _leaf_ids(compiled: Dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+    """Returns (n_trees, n_rows) global leaf node ids for every tree of every target."""
+    roots = compiled["roots"]
+    feature, threshold = compiled["feature"], compiled["threshold"]
+    left, right, is_leaf = compiled["left"], compiled["right"], compiled["is_leaf"]
+    n_rows, n_features = X.shape
+    flat_x = X.ravel()
+    # one cell per (tree, row); only cells that have not reached a leaf are advanced
+    nodes = np.repeat(roots, n_rows)
+    row_base = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, len(roots))
+    active = np.flatnonzero(~is_leaf[nodes])
+    while active.size:
+        cur = nodes[active]
+        go_left = flat_x[row_base[active] + feature[cur]] <= threshold[cur]
+        nxt = np.where(go_left, left[cur], right[cur])
+        nodes[active] = nxt
+        active = active[~is_leaf[nxt]]
+    return nodes.reshape(len(roots), n_rows)
+
+
+def predict_compiled(compiled: Dict[str, np.ndarray], X: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Predicts every target for a (n_rows, n_features) float32 batch.
+    Returns {target: predictions} with the same values sklearn's .predict gives.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_trees = len(compiled["roots"])
+    step = max(1, MAX_TRAVERSAL_CELLS // max(n_trees, 1))
+    out = {str(name): [] for name in compiled["targets"]}
+    for start in range(0, X.shape[0], step):
+        leaves = _leaf_ids(compiled, X[start:start + step])
+        for name in compiled["targets"]:
+            name = str(name)
+            t0, t1 = compiled[f"{name}__trees"]
+            values = compiled[f"{name}__values"]
+            local = leaves[t0:t1] - compiled[f"{name}__node_offset"]
+            acc = np.zeros(values[local[0]].shape, dtype=np.float64)
+            # accumulate tree by tree, as sklearn does, so sums are bit-identical
+            for t in range(t1 - t0):
+                acc += values[local[t]]
+            acc /= (t1 - t0)
+            if f"{name}__classes" in compiled:
+                out[name].append(compiled[f"{name}__classes"].take(np.argmax(acc, axis=1), axis=0))
+            else:
+                out[name].append(acc)
+    return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in out.items()}
@@ -0,0 +1,131 @@
+# backend/whisper_pool.py
+"""
+Pool of faster-whisper models sized to the machine.
+
+The pool holds `instances` WhisperModel copies. Each copy runs up to `num_workers`
+transcriptions at once (faster-whisper's num_workers) with `cpu_threads` threads apiece, so
+`slots = instances * num_workers` recordings are transcribed in parallel and the rest wait in
+acquire() (a requested slot count is rounded up to a multiple of `instances`). One instance
+with several workers shares the weights; extra instances only help when a single model's
+workers contend with each other.
+
+Defaults come from the available cores: 4 threads per transcription (what one model used
+before, CTranslate2's default) and as many slots as fit in the core count. On a 32-core box
+that is 8 transcriptions in parallel instead of one, with the other 28 cores idle.
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+DEFAULT_CPU_THREADS = 4
+WARMUP_SEC = 1.0
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class WhisperPool:
+    def __init__(self, model_name: str, device: str = "cpu", compute_type: str = "int8", instances: int = 1,
+                 slots: int = None, cpu_threads: int = None):
+        cores = available_cores()
+        self.model_name = model_name
+        self.device = device
+        self.cpu_threads = cpu_threads or min(DEFAULT_CPU_THREADS, cores)
+        if not slots:
+            slots = max(1, cores // self.cpu_threads) if device == "cpu" else 1
+        self.instances = max(1, min(instances, slots))
+        self.num_workers = math.ceil(slots / self.instances)
+        self.slots = self.instances * self.num_workers
+        self.cores = cores
+        self.models = [WhisperModel(model_name, device=device, compute_type=compute_type,
+                                    cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+                       for _ in range(self.instances)]
+        self._cond = threading.Condition()
+        self._created = time.monotonic()
+        self._waiting = 0
+        self._active = [0] * self.instances
+        self._start_sum = [0.0] * self.instances  # sum of start times of the running tasks
+        self._busy = [0.0] * self.instances       # seconds spent by finished tasks
+        self._tasks = [0] * self.instances
+        self._warmup = [None] * self.instances
+
+    @contextmanager
+    def acquire(self):
+        """Yields the least busy model with a free worker, waiting while every slot is taken."""
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    i = min(range(self.instances), key=self._active.__getitem__)
+                    if self._active[i] < self.num_workers:
+                        break
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+            start = time.monotonic()
+            self._active[i] += 1
+            self._start_sum[i] += start
+        try:
+            yield self.models[i]
+        finally:
+            with self._cond:
+                self._active[i] -= 1
+                self._start_sum[i] -= start
+                self._busy[i] += time.monotonic() - start
+                self._tasks[i] += 1
+                self._cond.notify()
+
+    def warm_up(self):
+        """Transcribes a second of silence on every instance so the first request skips lazy initialization."""
+        silence = np.zeros(int(16000 * WARMUP_SEC), dtype=np.float32)
+        for i, model in enumerate(self.models):
+            t0 = time.monotonic()
+            segments, _ = model.transcribe(silence, language="en", beam_size=1)
+            for _ in segments:
+                pass
+            self._warmup[i] = round(time.monotonic() - t0, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-instance utilization: busy worker-seconds over available worker-seconds since startup.
+        A worker is busy from acquire() until its context exits, so callers release it as soon as
+        transcription is done (iter_analysis runs the grammar check after releasing); anything
+        done inside the block would count as Whisper time and skew pool sizing.
+        """
+        with self._cond:
+            now = time.monotonic()
+            uptime = max(now - self._created, 1e-9)
+            per_instance = []
+            for i in range(self.instances):
+                busy = self._busy[i] + self._active[i] * now - self._start_sum[i]
+                per_instance.append({
+                    "instance": i,
+                    "active": self._active[i],
+                    "tasks": self._tasks[i],
+                    "busy_sec": round(busy, 2),
+                    "utilization": round(busy / (uptime * self.num_workers), 4),
+                    "warmup_sec": self._warmup[i],
+                })
+            return {
+                "model": self.model_name,
+                "device": self.device,
+                "cores": self.cores,
+                "instances": self.instances,
+                "num_workers": self.num_workers,
+                "cpu_threads": self.cpu_threads,
+                "slots": self.slots,
+                "active": sum(self._active),
+                "waiting": self._waiting,
+                "uptime_sec": round(uptime, 1),
+                "per_instance": per_instance,
+            }
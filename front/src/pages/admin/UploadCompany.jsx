@@ -4,6 +4,7 @@ const UploadCompany = () => {
   const [companyName, setCompanyName] = useState('');
   const [jobRole, setJobRole] = useState('');
   const [location, setLocation] = useState('');
+  const [skills, setSkills] = useState('');
   const [message, setMessage] = useState('');
 
   const handleSubmit = async (e) => {
@@ -12,7 +13,8 @@ const UploadCompany = () => {
     const jobData = {
       companyName,
       jobRole,
-      location
+      location,
+      skills
     };
 
     try {
@@ -27,6 +29,7 @@ const UploadCompany = () => {
         setCompanyName('');
         setJobRole('');
         setLocation('');
+        setSkills('');
       } else {
         setMessage('❌ Failed to upload. Please try again.');
       }
@@ -71,6 +74,16 @@ const UploadCompany = () => {
             required
           />
         </div>
+        <div className="mb-3">
+          <label>Required Skills (comma separated)</label>
+          <input
+            type="text"
+            className="form-control"
+            value={skills}
+            onChange={(e) => setSkills(e.target.value)}
+            placeholder="python, sql, machine learning"
+          />
+        </div>
         <button type="submit" className="btn btn-primary">Upload</button>
       </form>
     </div>
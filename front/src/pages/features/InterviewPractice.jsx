@@ -10,6 +10,8 @@ export default function InterviewPractice() {
   const [file, setFile] = useState(null);
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState(null);
+  const [jobStatus, setJobStatus] = useState(null);
   const mediaRecorderRef = useRef(null);
   const chunksRef = useRef([]);
   const streamRef = useRef(null);
@@ -81,24 +83,58 @@ export default function InterviewPractice() {
     }
     setLoading(true);
     setAnalysis(null);
+    setProgress(null);
+    setJobStatus(null);
     const fd = new FormData();
     fd.append("file", file);
 
+    // streamed analysis: job status lines, one JSON line per transcribed segment, then the final result
+    const handleLine = (line, transcript) => {
+      const json = JSON.parse(line);
+      if (json.status === "queued" || json.status === "running") {
+        setJobStatus(json.status);
+      } else if (json.status === "progress") {
+        if (json.partial.segment) transcript.push(json.partial.segment);
+        setProgress({ ...json.partial, transcript: transcript.join(" ") });
+      } else if (json.status === "ok") {
+        setAnalysis(json.analysis);
+      } else {
+        alert("Server error: " + (json.message || "unknown"));
+      }
+    };
+
     try {
-      const res = await fetch("http://localhost:5000/api/interview/analyze", {
+      const res = await fetch("http://localhost:5000/api/interview/analyze/stream", {
         method: "POST",
         body: fd
       });
-      const json = await res.json();
-      if (json.status === "ok") {
-        setAnalysis(json.analysis);
-      } else {
+      if (!res.ok || !res.body) {
+        const json = await res.json();
         alert("Server error: " + (json.message || "unknown"));
+        return;
+      }
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      const transcript = [];
+      let buffer = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let nl;
+        while ((nl = buffer.indexOf("\n")) >= 0) {
+          const line = buffer.slice(0, nl).trim();
+          buffer = buffer.slice(nl + 1);
+          if (line) handleLine(line, transcript);
+        }
       }
+      if (buffer.trim()) handleLine(buffer.trim(), transcript);
     } catch (e) {
       alert("Upload error: " + String(e));
     } finally {
       setLoading(false);
+      setProgress(null);
+      setJobStatus(null);
     }
   };
 
@@ -166,6 +202,19 @@ export default function InterviewPractice() {
         )}
       </div>
 
+      {loading && !progress && jobStatus === "queued" && (
+        <div className="alert alert-info mb-3">Waiting for a free transcription slot...</div>
+      )}
+
+      {loading && progress && (
+        <div className="card p-4 mb-3">
+          <h5>Live feedback <span className="badge bg-secondary">{progress.elapsed_sec}s analyzed</span></h5>
+          <div><strong>Words:</strong> {progress.word_count} &nbsp; <strong>WPM:</strong> {progress.wpm}</div>
+          <div><strong>Avg pause (s):</strong> {progress.avg_pause_sec} &nbsp; <strong>Fillers:</strong> {progress.filler_counts?.total ?? 0}</div>
+          <div className="p-2 mt-2 border rounded" style={{ whiteSpace: "pre-wrap", fontSize: 14 }}>{progress.transcript}</div>
+        </div>
+      )}
+
       {analysis && (
         <div className="card p-4">
           <div className="d-flex justify-content-between">